@@ -1,55 +1,51 @@
-import json
+import asyncio
+import functools
+import hashlib
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
+import orjson
 from google import genai
 from google.genai import types
+from pydantic import BaseModel
 
 from data_store import (
     get_doc_file,
+    get_llm_cache_file,
     get_profiling_file,
     get_schema_file,
     read_json,
     slugify_database_name,
     write_json,
 )
+from env_loader import load_env_file
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 ENV_FILE = Path(__file__).resolve().parent / ".env"
 GEMINI_MODEL = "gemini-flash-latest"
+GEMINI_MAX_CONCURRENCY = 4
 
+# schema.json and profiling.json are read side by side before each Gemini call.
+_READ_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="doc-read")
+_VALID_PRIORITIES = frozenset(("high", "medium", "low"))
 
-def _load_env_file(path: Path = ENV_FILE) -> None:
-    if not path.exists():
-        return
 
-    for raw_line in path.read_text(encoding="utf-8").splitlines():
-        line = raw_line.strip()
-        if not line or line.startswith("#"):
-            continue
+class TableDocResponse(BaseModel):
+    table_name: str
+    business_summary: str
+    usage_recommendations: list[str]
+    data_quality_observations: list[str]
+    suggested_kpis: list[str]
+    priority: str
 
-        if line.startswith("export "):
-            line = line[len("export "):].strip()
 
-        if "=" not in line:
-            continue
-
-        key, value = line.split("=", 1)
-        key = key.strip()
-        value = value.strip()
-
-        if not key or key in os.environ:
-            continue
-
-        if (
-            len(value) >= 2
-            and ((value[0] == value[-1] == '"') or (value[0] == value[-1] == "'"))
-        ):
-            value = value[1:-1]
-
-        os.environ[key] = value
+class BusinessDocResponse(BaseModel):
+    overview_summary: str
+    global_recommendations: list[str]
+    tables: list[TableDocResponse]
 
 
 def _get_required_env_var(key: str) -> str:
@@ -57,7 +53,7 @@ def _get_required_env_var(key: str) -> str:
     if value:
         return value
 
-    _load_env_file()
+    load_env_file(ENV_FILE)
     value = os.getenv(key)
     if value:
         return value
@@ -68,12 +64,12 @@ def _get_required_env_var(key: str) -> str:
 def _safe_json_loads(raw_text: str) -> dict[str, Any]:
     cleaned = raw_text.strip()
     if cleaned.startswith("```"):
-        lines = [line for line in cleaned.splitlines() if not line.startswith("```")]
-        cleaned = "\n".join(lines).strip()
+        # Drop the opening fence (with its language tag) and the closing fence.
+        cleaned = cleaned.partition("\n")[2].rsplit("```", 1)[0].strip()
 
     try:
-        parsed = json.loads(cleaned)
-    except json.JSONDecodeError as exc:
+        parsed = orjson.loads(cleaned)
+    except orjson.JSONDecodeError as exc:
         raise ValueError(f"Gemini did not return valid JSON: {exc}") from exc
 
     if not isinstance(parsed, dict):
@@ -82,14 +78,16 @@ def _safe_json_loads(raw_text: str) -> dict[str, Any]:
     return parsed
 
 
+@functools.lru_cache(maxsize=4)
 def _build_genai_client(api_key: str) -> genai.Client:
     # Force Gemini API key mode to avoid accidental Vertex/OAuth routing from host env.
+    # Clients are cached per key so pooled HTTP connections are reused across calls.
     return genai.Client(api_key=api_key, vertexai=False)
 
 
 def _to_string_list(value: Any, fallback: list[str]) -> list[str]:
     if isinstance(value, list):
-        cleaned = [str(item).strip() for item in value if str(item).strip()]
+        cleaned = [text for item in value if (text := str(item).strip())]
         if cleaned:
             return cleaned
     return fallback
@@ -97,9 +95,7 @@ def _to_string_list(value: Any, fallback: list[str]) -> list[str]:
 
 def _normalize_priority(value: Any) -> str:
     priority = str(value or "").strip().lower()
-    if priority in {"high", "medium", "low"}:
-        return priority
-    return "medium"
+    return priority if priority in _VALID_PRIORITIES else "medium"
 
 
 def _build_quality_observations(profile_entry: dict[str, Any]) -> list[str]:
@@ -136,28 +132,24 @@ def _default_business_summary(table_name: str, table_schema: dict[str, Any]) ->
     )
 
 
-def _build_prompt(
-    schema_payload: dict[str, Any], profiling_payload: dict[str, Any]
-) -> str:
-    return f"""
-You are an expert analytics consultant.
+_PROMPT_PREFIX = """You are an expert analytics consultant.
 Create a business-friendly documentation JSON from the provided schema and profiling data.
 
 Return ONLY a valid JSON object with this exact top-level structure:
-{{
+{
   "overview_summary": "string",
   "global_recommendations": ["string", "string", "string"],
   "tables": [
-    {{
+    {
       "table_name": "string",
       "business_summary": "string",
       "usage_recommendations": ["string", "string"],
       "data_quality_observations": ["string", "string"],
       "suggested_kpis": ["string", "string"],
       "priority": "high|medium|low"
-    }}
+    }
   ]
-}}
+}
 
 Rules:
 1) Include every table from the schema exactly once.
@@ -166,11 +158,109 @@ Rules:
 4) No markdown, no extra keys, JSON only.
 
 Schema JSON:
-{json.dumps(schema_payload, ensure_ascii=True)}
+"""
+_PROMPT_MIDDLE = """
 
 Profiling JSON:
-{json.dumps(profiling_payload, ensure_ascii=True)}
-""".strip()
+"""
+
+
+# Fields forwarded to Gemini. Per-column completeness and freshness statistics
+# are left out: they dominate the payload size and are not needed for
+# table-level documentation.
+_PROMPT_SCHEMA_FIELDS = {
+    "database": None,
+    "schema": {
+        "table_name": None,
+        "columns": {"name": None, "type": None, "nullable": None},
+        "primary_keys": None,
+        "foreign_keys": None,
+    },
+}
+_PROMPT_PROFILE_FIELDS = {
+    "database": None,
+    "profile": {
+        "table_name": None,
+        "completeness": {
+            "row_count": None,
+            "column_count": None,
+            "table_completeness_pct": None,
+        },
+        "freshness": {
+            "latest_column": None,
+            "latest_timestamp": None,
+            "staleness_days": None,
+        },
+        "key_health": {
+            "status": None,
+            "primary_key": None,
+            "foreign_keys": {"relationships_checked": None, "orphan_rows": None},
+        },
+    },
+}
+
+
+def _project(value: Any, fields: dict[str, Any] | None) -> Any:
+    if fields is None:
+        return value
+    if isinstance(value, list):
+        return [_project(item, fields) for item in value]
+    if isinstance(value, dict):
+        return {
+            key: _project(value[key], sub_fields)
+            for key, sub_fields in fields.items()
+            if key in value
+        }
+    return value
+
+
+def _prompt_json(payload: dict[str, Any], fields: dict[str, Any]) -> str:
+    # The pruned payload has to be re-encoded, so this deliberately replaces
+    # embedding the on-disk JSON text: the smaller prompt costs far less in
+    # Gemini tokens and latency than the orjson pass costs locally.
+    return orjson.dumps(_project(payload, fields)).decode("utf-8")
+
+
+def _build_prompt(
+    schema_payload: dict[str, Any], profiling_payload: dict[str, Any]
+) -> str:
+    return "".join(
+        (
+            _PROMPT_PREFIX,
+            _prompt_json(schema_payload, _PROMPT_SCHEMA_FIELDS),
+            _PROMPT_MIDDLE,
+            _prompt_json(profiling_payload, _PROMPT_PROFILE_FIELDS),
+        )
+    )
+
+
+def _build_table_doc(
+    table_name: str,
+    table_entry: dict[str, Any],
+    llm_table: dict[str, Any],
+    profile_entry: dict[str, Any],
+) -> dict[str, Any]:
+    return {
+        "table_name": table_name,
+        "business_summary": str(
+            llm_table.get("business_summary")
+            or _default_business_summary(table_name, table_entry)
+        ),
+        "usage_recommendations": _to_string_list(
+            llm_table.get("usage_recommendations"),
+            ["Define clear ownership and dashboard use cases for this table."],
+        ),
+        # Profile-based observations are only built when Gemini supplied none.
+        "data_quality_observations": _to_string_list(
+            llm_table.get("data_quality_observations"), []
+        )
+        or _build_quality_observations(profile_entry),
+        "suggested_kpis": _to_string_list(
+            llm_table.get("suggested_kpis"),
+            ["Define business KPIs based on this table and track trends weekly."],
+        ),
+        "priority": _normalize_priority(llm_table.get("priority")),
+    }
 
 
 def _normalize_document(
@@ -196,37 +286,18 @@ def _normalize_document(
         entry.get("table_name"): entry for entry in llm_tables if isinstance(entry, dict)
     }
 
-    table_docs = []
-    for table_entry in schema_tables:
-        table_name = table_entry.get("table_name")
-        if not table_name:
-            continue
-
-        llm_table = llm_by_table.get(table_name, {})
-        profile_entry = profile_by_table.get(table_name, {})
-
-        table_docs.append(
-            {
-                "table_name": table_name,
-                "business_summary": str(
-                    llm_table.get("business_summary")
-                    or _default_business_summary(table_name, table_entry)
-                ),
-                "usage_recommendations": _to_string_list(
-                    llm_table.get("usage_recommendations"),
-                    ["Define clear ownership and dashboard use cases for this table."],
-                ),
-                "data_quality_observations": _to_string_list(
-                    llm_table.get("data_quality_observations"),
-                    _build_quality_observations(profile_entry),
-                ),
-                "suggested_kpis": _to_string_list(
-                    llm_table.get("suggested_kpis"),
-                    ["Define business KPIs based on this table and track trends weekly."],
-                ),
-                "priority": _normalize_priority(llm_table.get("priority")),
-            }
+    llm_table_for = llm_by_table.get
+    profile_entry_for = profile_by_table.get
+    table_docs = [
+        _build_table_doc(
+            table_name,
+            table_entry,
+            llm_table_for(table_name, {}),
+            profile_entry_for(table_name, {}),
         )
+        for table_entry in schema_tables
+        if (table_name := table_entry.get("table_name"))
+    ]
 
     overview_summary = str(
         llm_payload.get("overview_summary")
@@ -263,55 +334,201 @@ def _normalize_document(
     }
 
 
-def generate_business_document(database: str) -> dict[str, Any]:
-    database_slug = slugify_database_name(database)
-    api_key = _get_required_env_var("GEMINI_API_KEY")
-    model_name = GEMINI_MODEL
+def _generation_config() -> types.GenerateContentConfig:
+    return types.GenerateContentConfig(
+        temperature=0,
+        response_mime_type="application/json",
+        response_schema=BusinessDocResponse,
+    )
+
+
+def _raise_for_auth_error(exc: Exception) -> None:
+    error_text = str(exc)
+    if "UNAUTHENTICATED" in error_text or "API keys are not supported" in error_text:
+        raise ValueError(
+            "Gemini authentication failed for API-key mode. "
+            "Ensure GEMINI_API_KEY is a valid Gemini API key from Google AI Studio, "
+            "and unset Vertex env flags such as GOOGLE_GENAI_USE_VERTEXAI."
+        ) from exc
 
+
+def _prompt_cache_key(prompt: str) -> str:
+    return hashlib.blake2b(
+        f"{GEMINI_MODEL}\n{prompt}".encode("utf-8"), digest_size=20
+    ).hexdigest()
+
+
+def _prepare_generation(database: str) -> dict[str, Any]:
     schema_file = get_schema_file(database)
     profiling_file = get_profiling_file(database)
     doc_file = get_doc_file(database, create_dir=True)
 
-    schema_payload = read_json(schema_file)
-    profiling_payload = read_json(profiling_file)
-
+    schema_payload, profiling_payload = _READ_EXECUTOR.map(
+        read_json, (schema_file, profiling_file)
+    )
     prompt = _build_prompt(schema_payload, profiling_payload)
-    client = _build_genai_client(api_key)
 
-    try:
-        response = client.models.generate_content(
-            model=model_name,
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                temperature=0,
-                response_mime_type="application/json",
-            ),
-        )
-    except Exception as exc:
-        error_text = str(exc)
-        if "UNAUTHENTICATED" in error_text or "API keys are not supported" in error_text:
-            raise ValueError(
-                "Gemini authentication failed for API-key mode. "
-                "Ensure GEMINI_API_KEY is a valid Gemini API key from Google AI Studio, "
-                "and unset Vertex env flags such as GOOGLE_GENAI_USE_VERTEXAI."
-            ) from exc
-        raise
+    return {
+        "database": database,
+        "database_slug": slugify_database_name(database),
+        "schema_file": schema_file,
+        "profiling_file": profiling_file,
+        "doc_file": doc_file,
+        "schema_payload": schema_payload,
+        "profiling_payload": profiling_payload,
+        "prompt": prompt,
+        "llm_cache_file": get_llm_cache_file(_prompt_cache_key(prompt)),
+    }
+
+
+def _llm_payload_from_response(response: types.GenerateContentResponse) -> dict[str, Any]:
+    # With response_schema set the SDK hands back a validated model; only fall
+    # back to parsing the raw text when it could not.
+    parsed = getattr(response, "parsed", None)
+    if isinstance(parsed, BaseModel):
+        return parsed.model_dump()
 
     raw_response = (response.text or "").strip()
     if not raw_response:
         raise ValueError("Gemini returned an empty response.")
+    return _safe_json_loads(raw_response)
+
+
+def _read_existing_document(doc_file: Path) -> dict[str, Any] | None:
+    try:
+        return read_json(doc_file)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _same_document(left: dict[str, Any], right: dict[str, Any]) -> bool:
+    return {key: value for key, value in left.items() if key != "generated_at"} == {
+        key: value for key, value in right.items() if key != "generated_at"
+    }
+
 
-    llm_payload = _safe_json_loads(raw_response)
+def _finalize_generation(
+    context: dict[str, Any], llm_payload: dict[str, Any]
+) -> dict[str, Any]:
     final_document = _normalize_document(
         llm_payload=llm_payload,
-        schema_payload=schema_payload,
-        profiling_payload=profiling_payload,
-        model_name=model_name,
-        database=database,
-        database_slug=database_slug,
-        schema_file=schema_file,
-        profiling_file=profiling_file,
-        doc_file=doc_file,
+        schema_payload=context["schema_payload"],
+        profiling_payload=context["profiling_payload"],
+        model_name=GEMINI_MODEL,
+        database=context["database"],
+        database_slug=context["database_slug"],
+        schema_file=context["schema_file"],
+        profiling_file=context["profiling_file"],
+        doc_file=context["doc_file"],
     )
-    write_json(doc_file, final_document)
+    existing_document = _read_existing_document(context["doc_file"])
+    if existing_document is not None and _same_document(existing_document, final_document):
+        # Keep the original generated_at when nothing else changed.
+        return dict(existing_document)
+
+    write_json(context["doc_file"], final_document)
     return final_document
+
+
+def _read_cached_llm_payload(context: dict[str, Any]) -> dict[str, Any] | None:
+    # Identical prompts (unchanged schema and profiling) reuse the stored
+    # Gemini output instead of calling the API again.
+    try:
+        return read_json(context["llm_cache_file"])
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _store_llm_payload(
+    context: dict[str, Any], response: types.GenerateContentResponse
+) -> dict[str, Any]:
+    llm_payload = _llm_payload_from_response(response)
+    write_json(context["llm_cache_file"], llm_payload)
+    return llm_payload
+
+
+def _has_schema_tables(context: dict[str, Any]) -> bool:
+    # With no tables there is nothing for Gemini to describe; the normalized
+    # defaults already produce a complete document for that case.
+    return bool(context["schema_payload"].get("schema"))
+
+
+def generate_business_document(database: str) -> dict[str, Any]:
+    context = _prepare_generation(database)
+    if not _has_schema_tables(context):
+        return _finalize_generation(context, {})
+
+    cached_payload = _read_cached_llm_payload(context)
+    if cached_payload is not None:
+        return _finalize_generation(context, cached_payload)
+
+    api_key = _get_required_env_var("GEMINI_API_KEY")
+    client = _build_genai_client(api_key)
+
+    try:
+        response = client.models.generate_content(
+            model=GEMINI_MODEL,
+            contents=context["prompt"],
+            config=_generation_config(),
+        )
+    except Exception as exc:
+        _raise_for_auth_error(exc)
+        raise
+
+    return _finalize_generation(context, _store_llm_payload(context, response))
+
+
+async def _agenerate_business_document(
+    client: genai.Client, database: str, semaphore: asyncio.Semaphore
+) -> dict[str, Any]:
+    # File reads and writes stay off the event loop; only the Gemini request
+    # itself is awaited on it.
+    context = await asyncio.to_thread(_prepare_generation, database)
+    if not _has_schema_tables(context):
+        return await asyncio.to_thread(_finalize_generation, context, {})
+
+    cached_payload = await asyncio.to_thread(_read_cached_llm_payload, context)
+    if cached_payload is not None:
+        return await asyncio.to_thread(_finalize_generation, context, cached_payload)
+
+    async with semaphore:
+        try:
+            response = await client.aio.models.generate_content(
+                model=GEMINI_MODEL,
+                contents=context["prompt"],
+                config=_generation_config(),
+            )
+        except Exception as exc:
+            _raise_for_auth_error(exc)
+            raise
+
+    llm_payload = await asyncio.to_thread(_store_llm_payload, context, response)
+    return await asyncio.to_thread(_finalize_generation, context, llm_payload)
+
+
+async def agenerate_business_documents(
+    databases: list[str], max_concurrency: int = GEMINI_MAX_CONCURRENCY
+) -> list[dict[str, Any]]:
+    # Entry point for callers that already run an event loop (FastAPI, ADK).
+    api_key = _get_required_env_var("GEMINI_API_KEY")
+    client = _build_genai_client(api_key)
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    return await asyncio.gather(
+        *(
+            _agenerate_business_document(client, database, semaphore)
+            for database in databases
+        )
+    )
+
+
+def generate_business_documents(
+    databases: list[str], max_concurrency: int = GEMINI_MAX_CONCURRENCY
+) -> list[dict[str, Any]]:
+    # Synchronous entry point: runs the blocking single-database path on a
+    # bounded thread pool instead of starting an event loop, so it is safe to
+    # call from any thread. The key is checked before any work starts.
+    _get_required_env_var("GEMINI_API_KEY")
+    with ThreadPoolExecutor(
+        max_workers=max(1, max_concurrency), thread_name_prefix="doc-generate"
+    ) as executor:
+        return list(executor.map(generate_business_document, databases))
@@ -1,18 +1,22 @@
 from __future__ import annotations
 
+import functools
+import itertools
 import os
+import re
 from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
 from datetime import date, datetime, time
 from decimal import Decimal
 from pathlib import Path
 from time import perf_counter
 from typing import Any
 
-import sqlparse
-from google.adk.agents.llm_agent import Agent
 from sqlalchemy import text
+from sqlalchemy.engine import URL
 
 from data_store import (
+    get_credentials_file,
     get_doc_file,
     get_profiling_file,
     get_schema_file,
@@ -20,13 +24,14 @@ from data_store import (
     read_json,
     slugify_database_name,
 )
-from db import build_connection_url, create_engine_from_url
+from db import build_connection_url, dispose_engine, get_engine
+from env_loader import load_env_file
 
 MODEL_NAME = "gemini-2.5-flash"
 MAX_SQL_ROW_LIMIT = 200
 SQL_TIMEOUT_SECONDS = 10
 
-MUTATING_OR_ADMIN_KEYWORDS = {
+MUTATING_OR_ADMIN_KEYWORDS = frozenset({
     "INSERT",
     "UPDATE",
     "DELETE",
@@ -54,60 +59,80 @@ MUTATING_OR_ADMIN_KEYWORDS = {
     "LOAD",
     "UNLOAD",
     "INTO",
-}
+})
+
+# Fast-path SQL screening. It may only accept a query; anything it cannot
+# clear with certainty falls through to the sqlparse-based validation.
+# Quotes, bracket/backtick identifiers, comments, escapes and dollar quoting
+# all change where a dialect thinks a token ends, so any query containing one
+# of them (or a `;` before the end) is left to the full parser.
+_NOT_PLAIN_SQL_RE = re.compile(r"[\\$#\[\]`'\";]|--|/\*")
+_READ_ONLY_PREFIX_RE = re.compile(r"\s*(?:SELECT|WITH)\b", re.IGNORECASE)
+_FORBIDDEN_KEYWORD_RE = re.compile(
+    r"\b(?:" + "|".join(sorted(MUTATING_OR_ADMIN_KEYWORDS)) + r")\b",
+    re.IGNORECASE,
+)
+
+# Shared workers for timed SQL execution; queries that outlive the timeout are
+# also cancelled server-side where the dialect supports it.
+_SQL_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="sql-timeout")
+_METADATA_EXECUTOR = ThreadPoolExecutor(max_workers=3, thread_name_prefix="metadata-read")
 
 _ACTIVE_DATABASE: str | None = None
+_CRED_CACHE: dict[str, tuple[int, dict[str, Any], URL]] = {}
+_ACTIVE_CONNECTION_URL: URL | None = None
+_ENV_LOADED = False
 _ENV_FILES = (
     Path(__file__).resolve().parent / ".env",
     Path(__file__).resolve().parent.parent / ".env",
 )
 
 
-def _load_env_file(path: Path) -> None:
-    if not path.exists():
+def _ensure_agent_env() -> None:
+    global _ENV_LOADED
+    if _ENV_LOADED:
         return
 
-    for raw_line in path.read_text(encoding="utf-8").splitlines():
-        line = raw_line.strip()
-        if not line or line.startswith("#"):
-            continue
-        if line.startswith("export "):
-            line = line[len("export ") :].strip()
-        if "=" not in line:
-            continue
-        key, value = line.split("=", 1)
-        key = key.strip()
-        value = value.strip()
-        if not key or key in os.environ:
-            continue
-        if (
-            len(value) >= 2
-            and ((value[0] == value[-1] == '"') or (value[0] == value[-1] == "'"))
-        ):
-            value = value[1:-1]
-        os.environ[key] = value
-
-
-def _ensure_agent_env() -> None:
     for env_file in _ENV_FILES:
-        _load_env_file(env_file)
+        load_env_file(env_file)
 
     # Keep API key aliases in sync for ADK/Gemini usage.
     if not os.getenv("GOOGLE_API_KEY") and os.getenv("GEMINI_API_KEY"):
         os.environ["GOOGLE_API_KEY"] = os.environ["GEMINI_API_KEY"]
     if not os.getenv("GEMINI_API_KEY") and os.getenv("GOOGLE_API_KEY"):
         os.environ["GEMINI_API_KEY"] = os.environ["GOOGLE_API_KEY"]
+    _ENV_LOADED = True
 
 
-def _json_safe_value(value: Any) -> Any:
-    if value is None:
-        return None
+def _decimal_to_json(value: Decimal) -> int | float:
+    if value == value.to_integral_value():
+        return int(value)
+    return float(value)
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+_JSON_SAFE_CONVERTERS = {
+    type(None): _identity,
+    str: _identity,
+    int: _identity,
+    float: _identity,
+    bool: _identity,
+    Decimal: _decimal_to_json,
+    datetime: datetime.isoformat,
+    date: date.isoformat,
+    time: time.isoformat,
+    bytes: bytes.hex,
+}
+
+
+def _json_safe_value_slow(value: Any) -> Any:
     if isinstance(value, (str, int, float, bool)):
         return value
     if isinstance(value, Decimal):
-        if value == value.to_integral_value():
-            return int(value)
-        return float(value)
+        return _decimal_to_json(value)
     if isinstance(value, (datetime, date, time)):
         return value.isoformat()
     if isinstance(value, bytes):
@@ -115,6 +140,18 @@ def _json_safe_value(value: Any) -> Any:
     return str(value)
 
 
+def _json_safe_value(value: Any) -> Any:
+    # Most cells are plain str/int/float/None; identity checks skip the lookup.
+    value_type = type(value)
+    if value_type is str or value_type is int or value_type is float or value is None:
+        return value
+
+    converter = _JSON_SAFE_CONVERTERS.get(value_type)
+    if converter is not None:
+        return converter(value)
+    return _json_safe_value_slow(value)
+
+
 def _normalize_table_filter(table_name: str | None) -> str | None:
     if table_name is None:
         return None
@@ -122,6 +159,24 @@ def _normalize_table_filter(table_name: str | None) -> str | None:
     return cleaned or None
 
 
+def _filter_rows_by_table(
+    payload: Any, key: str, filter_value: str | None
+) -> list[Any]:
+    rows = payload.get(key, []) if isinstance(payload, dict) else []
+    if not isinstance(rows, list):
+        return []
+
+    if filter_value:
+        needle = filter_value.lower()
+        rows = [
+            row
+            for row in rows
+            if isinstance(row, dict)
+            and str(row.get("table_name", "")).lower() == needle
+        ]
+    return rows
+
+
 def _normalize_row_limit(row_limit: int) -> int:
     try:
         parsed = int(row_limit)
@@ -130,7 +185,26 @@ def _normalize_row_limit(row_limit: int) -> int:
     return max(1, min(MAX_SQL_ROW_LIMIT, parsed))
 
 
-def _active_db_or_error() -> tuple[str | None, dict[str, Any] | None, dict[str, Any] | None]:
+def _load_connection(database: str) -> tuple[dict[str, Any], URL]:
+    # Normalized credentials and their connection URL are reused until
+    # credentials.json changes on disk.
+    try:
+        mtime_ns = os.stat(get_credentials_file(database)).st_mtime_ns
+    except FileNotFoundError:
+        mtime_ns = None
+
+    cached = _CRED_CACHE.get(database)
+    if cached is not None and mtime_ns is not None and cached[0] == mtime_ns:
+        return cached[1], cached[2]
+
+    credentials = load_credentials(database)
+    connection_url = _build_connection_url(credentials)
+    if mtime_ns is not None:
+        _CRED_CACHE[database] = (mtime_ns, credentials, connection_url)
+    return credentials, connection_url
+
+
+def _active_db_or_error() -> tuple[str | None, URL | None, dict[str, Any] | None]:
     if not _ACTIVE_DATABASE:
         return (
             None,
@@ -143,7 +217,7 @@ def _active_db_or_error() -> tuple[str | None, dict[str, Any] | None, dict[str,
         )
 
     try:
-        credentials = load_credentials(_ACTIVE_DATABASE)
+        credentials, connection_url = _load_connection(_ACTIVE_DATABASE)
     except FileNotFoundError as exc:
         return (
             None,
@@ -175,10 +249,10 @@ def _active_db_or_error() -> tuple[str | None, dict[str, Any] | None, dict[str,
             },
         )
 
-    return credentials["database"], credentials, None
+    return credentials["database"], connection_url, None
 
 
-def _build_connection_url(credentials: dict[str, Any]) -> str:
+def _build_connection_url(credentials: dict[str, Any]) -> URL:
     return build_connection_url(
         credentials["db_type"],
         credentials["host"],
@@ -189,75 +263,147 @@ def _build_connection_url(credentials: dict[str, Any]) -> str:
     )
 
 
-def _extract_uppercase_keywords(statement) -> set[str]:
-    keywords: set[str] = set()
+@functools.lru_cache(maxsize=1)
+def _sqlparse():
+    # sqlparse is only needed when the regex fast path cannot clear a query.
+    import sqlparse
+
+    return sqlparse
+
+
+def _scan_statement(statement) -> tuple[str, str, tuple[str, ...]] | None:
+    # One pass over the token stream: the first meaningful token must open a
+    # SELECT/CTE and no keyword may be on the forbidden list.
+    tokens = _sqlparse().tokens
+    seen_leading_token = False
     for token in statement.flatten():
         token_type = token.ttype
-        if token_type is None:
-            continue
-        if token.is_whitespace:
-            continue
-        if token_type in sqlparse.tokens.Comment:
-            continue
-        if token_type not in sqlparse.tokens.Keyword:
+        # MySQL `#` comments and PostgreSQL nested block comments end somewhere
+        # other than where sqlparse thinks, so the scan cannot vouch for them.
+        if "#" in token.value and token_type not in tokens.String:
+            return ("unsafe_sql", "Query uses comment syntax that cannot be validated.", ())
+        if token_type in tokens.Comment and token.value.count("/*") > 1:
+            return ("unsafe_sql", "Query uses comment syntax that cannot be validated.", ())
+
+        if token.is_whitespace or token_type in tokens.Comment:
             continue
 
-        raw = token.value.strip().upper()
-        if not raw:
+        if not seen_leading_token:
+            seen_leading_token = True
+            if token.normalized not in ("SELECT", "WITH"):
+                return ("unsafe_sql", "Only read-only SELECT/CTE queries are allowed.", ())
+
+        if token_type is None or token_type not in tokens.Keyword:
             continue
-        for piece in raw.replace(",", " ").replace("(", " ").replace(")", " ").split():
-            if piece:
-                keywords.add(piece)
-    return keywords
 
+        # Multi-word keywords such as "ORDER BY" arrive as one token.
+        for piece in token.value.upper().split():
+            if piece in MUTATING_OR_ADMIN_KEYWORDS:
+                return (
+                    "unsafe_sql",
+                    f"Query blocked because it contains forbidden keywords: {piece}",
+                    (piece,),
+                )
+
+    if not seen_leading_token:
+        return ("unsafe_sql", "Only read-only SELECT/CTE queries are allowed.", ())
+    return None
 
-def _validate_read_only_sql(query: str) -> dict[str, Any] | None:
-    cleaned = query.strip()
-    if not cleaned:
-        return {
-            "status": "error",
-            "error_type": "invalid_sql",
-            "message": "Query is empty. Provide a SELECT query.",
-        }
 
-    statements = [stmt for stmt in sqlparse.parse(cleaned) if str(stmt).strip()]
-    if len(statements) != 1:
-        return {
-            "status": "error",
-            "error_type": "unsafe_sql",
-            "message": "Only a single read-only SQL statement is allowed.",
-        }
+def _sql_error(
+    error_type: str, message: str, blocked_keywords: tuple[str, ...] = ()
+) -> dict[str, Any]:
+    error: dict[str, Any] = {
+        "status": "error",
+        "error_type": error_type,
+        "message": message,
+    }
+    if blocked_keywords:
+        error["blocked_keywords"] = list(blocked_keywords)
+    return error
 
-    statement = statements[0]
-    statement_type = statement.get_type().upper()
-    if statement_type != "SELECT":
-        return {
-            "status": "error",
-            "error_type": "unsafe_sql",
-            "message": "Only read-only SELECT/CTE queries are allowed.",
-        }
 
-    found_keywords = _extract_uppercase_keywords(statement)
-    blocked = sorted(found_keywords.intersection(MUTATING_OR_ADMIN_KEYWORDS))
-    if blocked:
-        return {
-            "status": "error",
-            "error_type": "unsafe_sql",
-            "message": (
-                "Query blocked because it contains forbidden keywords: "
-                + ", ".join(blocked)
-            ),
-            "blocked_keywords": blocked,
-        }
+def _is_plainly_read_only(cleaned: str) -> bool:
+    stripped = cleaned[:-1] if cleaned.endswith(";") else cleaned
+    if _NOT_PLAIN_SQL_RE.search(stripped):
+        return False
 
-    return None
+    return (
+        _READ_ONLY_PREFIX_RE.match(stripped) is not None
+        and _FORBIDDEN_KEYWORD_RE.search(stripped) is None
+    )
 
 
-def _run_query(connection_url: str, query: str, row_limit: int) -> dict[str, Any]:
-    engine = create_engine_from_url(connection_url)
+@functools.lru_cache(maxsize=512)
+def _validate_read_only_sql_cached(
+    cleaned: str,
+) -> tuple[str, str, tuple[str, ...]] | None:
+    if not cleaned:
+        return ("invalid_sql", "Query is empty. Provide a SELECT query.", ())
+
+    if _is_plainly_read_only(cleaned):
+        return None
+
+    statements = [stmt for stmt in _sqlparse().parse(cleaned) if str(stmt).strip()]
+    if len(statements) != 1:
+        return ("unsafe_sql", "Only a single read-only SQL statement is allowed.", ())
+
+    return _scan_statement(statements[0])
+
+
+def _validate_read_only_sql(query: str) -> dict[str, Any] | None:
+    # Only surrounding whitespace is normalized: collapsing inner newlines
+    # would change the meaning of `--` comments.
+    cached = _validate_read_only_sql_cached(query.strip())
+    if cached is None:
+        return None
+    return _sql_error(*cached)
+
+
+@contextmanager
+def _statement_timeout(conn):
+    # Engines are shared with the profiling and schema endpoints, so any
+    # session-level limit is put back before the connection returns to the pool.
+    timeout_ms = SQL_TIMEOUT_SECONDS * 1000
+    dialect_name = conn.dialect.name
+    if dialect_name == "postgresql":
+        # SET LOCAL ends with the transaction, which closes with the connection.
+        conn.execute(text(f"SET LOCAL statement_timeout = {timeout_ms}"))
+        yield
+    elif dialect_name == "mysql":
+        conn.execute(text(f"SET SESSION MAX_EXECUTION_TIME = {timeout_ms}"))
+        try:
+            yield
+        finally:
+            try:
+                conn.execute(text("SET SESSION MAX_EXECUTION_TIME = DEFAULT"))
+            except Exception:
+                # Never hand a still-limited session back to the pool.
+                conn.invalidate()
+    elif dialect_name == "mssql":
+        # pyodbc applies Connection.timeout (seconds) to every statement.
+        dbapi_connection = conn.connection.dbapi_connection
+        previous_timeout = dbapi_connection.timeout
+        dbapi_connection.timeout = SQL_TIMEOUT_SECONDS
+        try:
+            yield
+        finally:
+            dbapi_connection.timeout = previous_timeout
+    else:
+        yield
+
+
+def _run_query(
+    connection_url: URL, query: str, row_limit: int, result_format: str = "soa"
+) -> dict[str, Any]:
+    engine = get_engine(connection_url)
     started = perf_counter()
-    try:
-        with engine.connect() as conn:
+    # Stream from a server-side cursor so only the rows we keep are fetched,
+    # instead of the driver buffering the full result set client-side.
+    with engine.connect().execution_options(
+        stream_results=True, max_row_buffer=row_limit + 1
+    ) as conn:
+        with _statement_timeout(conn):
             result = conn.execute(text(query))
             if not result.returns_rows:
                 return {
@@ -266,39 +412,42 @@ def _run_query(connection_url: str, query: str, row_limit: int) -> dict[str, Any
                     "message": "Only queries that return rows are allowed.",
                 }
 
-            mapping_rows = result.mappings().fetchmany(row_limit + 1)
-            truncated = len(mapping_rows) > row_limit
-            if truncated:
-                mapping_rows = mapping_rows[:row_limit]
-
-            rows = [
-                {str(key): _json_safe_value(value) for key, value in dict(row).items()}
-                for row in mapping_rows
+            json_safe = _json_safe_value
+            columns = [str(key) for key in result.keys()]
+            values = [
+                [json_safe(value) for value in row]
+                for row in itertools.islice(result, row_limit + 1)
             ]
-            columns = list(rows[0].keys()) if rows else list(result.keys())
-    finally:
-        engine.dispose()
+            truncated = len(values) > row_limit
+            del values[row_limit:]
+            result.close()
+
+    payload: dict[str, Any] = {"status": "success", "columns": columns}
+    if result_format == "aos":
+        payload["rows"] = [dict(zip(columns, row)) for row in values]
+    else:
+        payload["values"] = values
 
     return {
-        "status": "success",
-        "columns": columns,
-        "rows": rows,
-        "row_count": len(rows),
+        **payload,
+        "row_count": len(values),
         "truncated": truncated,
         "row_limit_applied": row_limit,
         "execution_ms": int((perf_counter() - started) * 1000),
     }
 
 
-def _run_query_with_timeout(connection_url: str, query: str, row_limit: int) -> dict[str, Any]:
-    executor = ThreadPoolExecutor(max_workers=1)
-    future = executor.submit(_run_query, connection_url, query, row_limit)
+def _run_query_with_timeout(
+    connection_url: URL, query: str, row_limit: int, result_format: str = "soa"
+) -> dict[str, Any]:
+    future = _SQL_EXECUTOR.submit(
+        _run_query, connection_url, query, row_limit, result_format
+    )
 
     try:
         return future.result(timeout=SQL_TIMEOUT_SECONDS)
     except FutureTimeoutError:
         future.cancel()
-        executor.shutdown(wait=False, cancel_futures=True)
         return {
             "status": "error",
             "error_type": "query_timeout",
@@ -308,20 +457,16 @@ def _run_query_with_timeout(connection_url: str, query: str, row_limit: int) ->
             ),
         }
     except Exception as exc:
-        executor.shutdown(wait=False, cancel_futures=True)
         return {
             "status": "error",
             "error_type": "query_execution_error",
             "message": f"Failed to execute query: {exc}",
         }
-    finally:
-        if not future.cancelled():
-            executor.shutdown(wait=False, cancel_futures=True)
 
 
 def set_active_database(database: str) -> dict[str, str]:
     """Set the active database for chat tools using data/<db-slug>/credentials.json."""
-    global _ACTIVE_DATABASE
+    global _ACTIVE_DATABASE, _ACTIVE_CONNECTION_URL
 
     database_name = str(database or "").strip()
     if not database_name:
@@ -331,8 +476,18 @@ def set_active_database(database: str) -> dict[str, str]:
         }
 
     try:
-        credentials = load_credentials(database_name)
+        credentials, connection_url = _load_connection(database_name)
+        # Engines are cached per URL and shared with the API endpoints; when the
+        # same database is re-activated with different credentials, release
+        # only the old URL's pool.
+        if (
+            credentials["database"] == _ACTIVE_DATABASE
+            and _ACTIVE_CONNECTION_URL is not None
+            and connection_url != _ACTIVE_CONNECTION_URL
+        ):
+            dispose_engine(_ACTIVE_CONNECTION_URL)
         _ACTIVE_DATABASE = credentials["database"]
+        _ACTIVE_CONNECTION_URL = connection_url
     except Exception as exc:
         return {
             "status": "error",
@@ -365,18 +520,7 @@ def read_schema_json(table_name: str | None = None) -> dict[str, Any]:
             "message": f"Failed to read schema.json: {exc}",
         }
 
-    rows = payload.get("schema", []) if isinstance(payload, dict) else []
-    if not isinstance(rows, list):
-        rows = []
-
-    if filter_value:
-        needle = filter_value.lower()
-        rows = [
-            row
-            for row in rows
-            if isinstance(row, dict)
-            and str(row.get("table_name", "")).lower() == needle
-        ]
+    rows = _filter_rows_by_table(payload, "schema", filter_value)
 
     return {
         "status": "success",
@@ -405,18 +549,7 @@ def read_profiling_json(table_name: str | None = None) -> dict[str, Any]:
             "message": f"Failed to read profiling.json: {exc}",
         }
 
-    rows = payload.get("profile", []) if isinstance(payload, dict) else []
-    if not isinstance(rows, list):
-        rows = []
-
-    if filter_value:
-        needle = filter_value.lower()
-        rows = [
-            row
-            for row in rows
-            if isinstance(row, dict)
-            and str(row.get("table_name", "")).lower() == needle
-        ]
+    rows = _filter_rows_by_table(payload, "profile", filter_value)
 
     return {
         "status": "success",
@@ -448,18 +581,7 @@ def read_doc_json(table_name: str | None = None) -> dict[str, Any]:
     if not isinstance(payload, dict):
         payload = {}
 
-    tables = payload.get("tables", [])
-    if not isinstance(tables, list):
-        tables = []
-
-    if filter_value:
-        needle = filter_value.lower()
-        tables = [
-            row
-            for row in tables
-            if isinstance(row, dict)
-            and str(row.get("table_name", "")).lower() == needle
-        ]
+    tables = _filter_rows_by_table(payload, "tables", filter_value)
 
     return {
         "status": "success",
@@ -471,14 +593,72 @@ def read_doc_json(table_name: str | None = None) -> dict[str, Any]:
     }
 
 
-def execute_read_only_sql(query: str, row_limit: int = MAX_SQL_ROW_LIMIT) -> dict[str, Any]:
-    """Execute a single read-only SELECT/CTE query against the active database."""
-    database, credentials, error = _active_db_or_error()
+def read_all_metadata(table_name: str | None = None) -> dict[str, Any]:
+    """Read schema.json, profiling.json, and doc.json together for the active database."""
+    database, _, error = _active_db_or_error()
     if error:
         return error
 
     assert database is not None
-    assert credentials is not None
+    filter_value = _normalize_table_filter(table_name)
+
+    sources = {
+        "schema.json": get_schema_file(database),
+        "profiling.json": get_profiling_file(database),
+        "doc.json": get_doc_file(database),
+    }
+    futures = {
+        name: _METADATA_EXECUTOR.submit(read_json, path)
+        for name, path in sources.items()
+    }
+
+    payloads: dict[str, Any] = {}
+    errors: dict[str, str] = {}
+    for name, future in futures.items():
+        try:
+            payloads[name] = future.result()
+        except Exception as exc:
+            payloads[name] = {}
+            errors[name] = f"Failed to read {name}: {exc}"
+
+    if len(errors) == len(sources):
+        return {
+            "status": "error",
+            "error_type": "metadata_read_error",
+            "message": "; ".join(errors.values()),
+        }
+
+    doc_payload = payloads["doc.json"]
+    result = {
+        "status": "success",
+        "database": database,
+        "table_filter": filter_value,
+        "schema": _filter_rows_by_table(payloads["schema.json"], "schema", filter_value),
+        "profile": _filter_rows_by_table(
+            payloads["profiling.json"], "profile", filter_value
+        ),
+        "overview": doc_payload.get("overview", {}) if isinstance(doc_payload, dict) else {},
+        "tables": _filter_rows_by_table(doc_payload, "tables", filter_value),
+    }
+    if errors:
+        result["errors"] = errors
+    return result
+
+
+def execute_read_only_sql(
+    query: str, row_limit: int = MAX_SQL_ROW_LIMIT, result_format: str = "soa"
+) -> dict[str, Any]:
+    """Execute a single read-only SELECT/CTE query against the active database.
+
+    Results come back as `columns` plus row-ordered `values` arrays ("soa"), or as
+    a list of row objects under `rows` when result_format is "aos".
+    """
+    database, connection_url, error = _active_db_or_error()
+    if error:
+        return error
+
+    assert database is not None
+    assert connection_url is not None
 
     if not isinstance(query, str):
         return {
@@ -487,44 +667,65 @@ def execute_read_only_sql(query: str, row_limit: int = MAX_SQL_ROW_LIMIT) -> dic
             "message": "Query must be a string.",
         }
 
+    if result_format not in ("soa", "aos"):
+        return {
+            "status": "error",
+            "error_type": "invalid_result_format",
+            "message": "result_format must be 'soa' or 'aos'.",
+        }
+
     safety_error = _validate_read_only_sql(query)
     if safety_error:
         return safety_error
 
     effective_limit = _normalize_row_limit(row_limit)
-    connection_url = _build_connection_url(credentials)
-    execution_result = _run_query_with_timeout(connection_url, query, effective_limit)
+    execution_result = _run_query_with_timeout(
+        connection_url, query, effective_limit, result_format
+    )
     execution_result.setdefault("database", database)
     execution_result.setdefault("query", query.strip())
     return execution_result
 
 
-_ensure_agent_env()
-
-root_agent = Agent(
-    model=MODEL_NAME,
-    name="root_agent",
-    description=(
-        "Database-only AI chat agent for schema/profiling/doc reasoning and "
-        "strictly read-only SQL execution."
-    ),
-    instruction=(
-        "You are DataLens DB Agent. Answer ONLY database-related questions for the active "
-        "database. If the user asks anything not related to databases, schema, profiling, "
-        "documentation, SQL, or data quality, politely refuse and state that you only answer "
-        "database-related queries.\n"
-        "Use tools to read schema.json, profiling.json, and doc.json whenever needed.\n"
-        "You may execute SQL only through execute_read_only_sql and only for read-only analysis.\n"
-        "Never run or suggest running SQL that modifies data or schema.\n"
-        "If the user asks to suggest SQL/query/examples, provide SQL text only and do NOT "
-        "execute it.\n"
-        "If query execution is blocked by safety policy, explain why and provide a safe "
-        "read-only alternative."
-    ),
-    tools=[
-        read_schema_json,
-        read_profiling_json,
-        read_doc_json,
-        execute_read_only_sql,
-    ],
-)
+@functools.lru_cache(maxsize=1)
+def get_root_agent():
+    # google.adk is heavy to import; defer it until the agent is first needed.
+    from google.adk.agents.llm_agent import Agent
+
+    _ensure_agent_env()
+    return Agent(
+        model=MODEL_NAME,
+        name="root_agent",
+        description=(
+            "Database-only AI chat agent for schema/profiling/doc reasoning and "
+            "strictly read-only SQL execution."
+        ),
+        instruction=(
+            "You are DataLens DB Agent. Answer ONLY database-related questions for the active "
+            "database. If the user asks anything not related to databases, schema, profiling, "
+            "documentation, SQL, or data quality, politely refuse and state that you only answer "
+            "database-related queries.\n"
+            "Use tools to read schema.json, profiling.json, and doc.json whenever needed; "
+            "prefer read_all_metadata when you need more than one of them.\n"
+            "You may execute SQL only through execute_read_only_sql and only for read-only analysis.\n"
+            "Never run or suggest running SQL that modifies data or schema.\n"
+            "If the user asks to suggest SQL/query/examples, provide SQL text only and do NOT "
+            "execute it.\n"
+            "If query execution is blocked by safety policy, explain why and provide a safe "
+            "read-only alternative."
+        ),
+        tools=[
+            read_schema_json,
+            read_profiling_json,
+            read_doc_json,
+            read_all_metadata,
+            execute_read_only_sql,
+        ],
+    )
+
+
+def __getattr__(name: str) -> Any:
+    # Keep `chat_agent.agent.root_agent` working for ADK's agent loader.
+    if name == "root_agent":
+        return get_root_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,14 +1,35 @@
-import json
+import functools
+import mmap
+import os
 import re
+import threading
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterable, Iterator
+
+import orjson
 
 DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+LLM_CACHE_DIR = DATA_DIR / ".llm_cache"
 
 CREDENTIALS_FILENAME = "credentials.json"
 SCHEMA_FILENAME = "schema.json"
 PROFILING_FILENAME = "profiling.json"
 DOC_FILENAME = "doc.json"
+META_FILENAME = "meta.json"
+
+_SLUG_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+_SLUG_REPEATED_DASH_RE = re.compile(r"-{2,}")
+
+# Parsed JSON payloads keyed by path; an entry is reused while the file's
+# (st_mtime_ns, st_size) pair is unchanged. Callers must treat returned
+# payloads as read-only because they are shared between calls.
+_JSON_CACHE: dict[Path, tuple[int, int, dict[str, Any]]] = {}
+# Oldest entries are dropped past this many files so removed or renamed
+# databases cannot pin their parsed payloads in memory forever.
+JSON_CACHE_MAX_ENTRIES = 512
+
+# read_json memory-maps files at least this large rather than reading them.
+MMAP_MIN_BYTES = 1024 * 1024
 
 SUPPORTED_DB_TYPES = {"mysql", "postgresql", "sqlserver"}
 REQUIRED_CREDENTIAL_FIELDS = (
@@ -21,12 +42,13 @@ REQUIRED_CREDENTIAL_FIELDS = (
 )
 
 
+@functools.lru_cache(maxsize=64)
 def slugify_database_name(database: str) -> str:
     if not database or not database.strip():
         raise ValueError("database is required.")
 
-    slug = re.sub(r"[^a-z0-9]+", "-", database.strip().lower())
-    slug = re.sub(r"-{2,}", "-", slug).strip("-")
+    slug = _SLUG_NON_ALNUM_RE.sub("-", database.strip().lower())
+    slug = _SLUG_REPEATED_DASH_RE.sub("-", slug).strip("-")
 
     if not slug:
         raise ValueError("database must contain at least one alphanumeric character.")
@@ -42,8 +64,18 @@ def get_database_dir(database: str, create: bool = False) -> Path:
     return db_dir
 
 
+@functools.lru_cache(maxsize=256)
+def _database_file_path(database: str, filename: str) -> Path:
+    return DATA_DIR / slugify_database_name(database) / filename
+
+
 def get_database_file_path(database: str, filename: str, create_dir: bool = False) -> Path:
-    return get_database_dir(database, create=create_dir) / filename
+    # Handlers resolve the same few files several times per request; the
+    # joined Path is memoized and only the optional mkdir touches the disk.
+    path = _database_file_path(database, filename)
+    if create_dir:
+        path.parent.mkdir(parents=True, exist_ok=True)
+    return path
 
 
 def get_credentials_file(database: str, create_dir: bool = False) -> Path:
@@ -62,28 +94,175 @@ def get_doc_file(database: str, create_dir: bool = False) -> Path:
     return get_database_file_path(database, DOC_FILENAME, create_dir=create_dir)
 
 
-def read_json(path: Path) -> dict[str, Any]:
-    if not path.exists():
-        raise FileNotFoundError(f"Required file not found: {path}")
+def get_llm_cache_file(cache_key: str) -> Path:
+    return LLM_CACHE_DIR / f"{cache_key}.json"
 
-    raw = path.read_text(encoding="utf-8").strip()
-    if not raw:
-        raise ValueError(f"Required file is empty: {path}")
 
+def _stat_required_file(path: Path) -> os.stat_result:
     try:
-        payload = json.loads(raw)
-    except json.JSONDecodeError as exc:
+        return os.stat(path)
+    except FileNotFoundError as exc:
+        raise FileNotFoundError(f"Required file not found: {path}") from exc
+
+
+def _get_cached_json(path: Path, stat: os.stat_result) -> dict[str, Any] | None:
+    cached = _JSON_CACHE.get(path)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+    return None
+
+
+def _decode_json(
+    path: Path, stat: os.stat_result, raw: bytes | memoryview
+) -> dict[str, Any]:
+    try:
+        payload = orjson.loads(raw)
+    except orjson.JSONDecodeError as exc:
         raise ValueError(f"Invalid JSON in file {path}: {exc}") from exc
 
     if not isinstance(payload, dict):
         raise ValueError(f"JSON root must be an object in {path}")
 
+    _JSON_CACHE.pop(path, None)
+    _JSON_CACHE[path] = (stat.st_mtime_ns, stat.st_size, payload)
+    while len(_JSON_CACHE) > JSON_CACHE_MAX_ENTRIES:
+        try:
+            del _JSON_CACHE[next(iter(_JSON_CACHE))]
+        except (KeyError, RuntimeError, StopIteration):
+            break
     return payload
 
 
-def write_json(path: Path, payload: dict[str, Any]) -> None:
+def _parse_json(path: Path, stat: os.stat_result, raw: bytes) -> dict[str, Any]:
+    if not raw or raw.isspace():
+        raise ValueError(f"Required file is empty: {path}")
+
+    return _decode_json(path, stat, raw)
+
+
+def _parse_json_mapped(path: Path, stat: os.stat_result) -> dict[str, Any]:
+    # Large files are parsed straight from the page cache instead of being
+    # copied into a bytes object first.
+    with open(path, "rb") as handle, mmap.mmap(
+        handle.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mapped:
+        view = memoryview(mapped)
+        try:
+            return _decode_json(path, stat, view)
+        finally:
+            view.release()
+
+
+def read_json(path: Path) -> dict[str, Any]:
+    stat = _stat_required_file(path)
+    cached = _get_cached_json(path, stat)
+    if cached is not None:
+        return cached
+
+    if stat.st_size >= MMAP_MIN_BYTES:
+        return _parse_json_mapped(path, stat)
+    return _parse_json(path, stat, path.read_bytes())
+
+
+def record_table_count(path: Path, count: int) -> None:
+    # Keeps the table count of `path` in the sibling meta.json, tied to the
+    # file's (mtime, size) so any later rewrite invalidates the entry.
+    meta_file = path.parent / META_FILENAME
+    try:
+        meta = dict(read_json(meta_file))
+    except (FileNotFoundError, ValueError):
+        meta = {}
+
+    stat = os.stat(path)
+    meta[path.name] = [stat.st_mtime_ns, stat.st_size, count]
+    write_json(meta_file, meta)
+
+
+def recorded_table_count(
+    path: Path, stat: os.stat_result, meta: dict[str, Any]
+) -> int | None:
+    recorded = meta.get(path.name)
+    if (
+        isinstance(recorded, list)
+        and len(recorded) == 3
+        and recorded[0] == stat.st_mtime_ns
+        and recorded[1] == stat.st_size
+    ):
+        return recorded[2]
+    return None
+
+
+def forget_cached_json(directory: Path) -> None:
+    for path in [path for path in _JSON_CACHE if path.parent == directory]:
+        _JSON_CACHE.pop(path, None)
+
+
+def write_json(
+    path: Path,
+    payload: dict[str, Any],
+    default: Callable[[Any], Any] | None = None,
+) -> None:
+    write_json_bytes(
+        path, orjson.dumps(payload, default=default, option=orjson.OPT_INDENT_2)
+    )
+
+
+def write_json_bytes(path: Path, data: bytes) -> None:
+    # Leave byte-identical files untouched to avoid needless disk writes.
+    try:
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            return
+    except FileNotFoundError:
+        pass
+
+    # Written through a temporary file and renamed into place, so a
+    # concurrent read_json never sees (and caches) a half-written file.
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    # Coarse filesystem timestamps can leave (mtime, size) unchanged after a
+    # rewrite, so never trust the cached payload for a file we just wrote.
+    _JSON_CACHE.pop(path, None)
+
+
+def stream_json(
+    path: Path,
+    head: dict[str, Any],
+    key: str,
+    items: Iterable[Any],
+    default: Callable[[Any], Any] | None = None,
+) -> Iterator[bytes]:
+    # Writes `{**head, key: [*items]}` to `path` one item at a time and yields
+    # the same bytes, so neither the file nor a response body needs the whole
+    # payload in memory. The file is only replaced once every item is written.
+    opening = orjson.dumps(head, default=default)[:-1]
+    separator = b"," if head else b""
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    try:
+        with open(tmp_path, "wb") as handle:
+            chunk = opening + separator + orjson.dumps(key) + b":["
+            handle.write(chunk)
+            yield chunk
+
+            for index, item in enumerate(items):
+                chunk = (b",\n" if index else b"\n") + orjson.dumps(item, default=default)
+                handle.write(chunk)
+                yield chunk
+
+            chunk = b"\n]}"
+            handle.write(chunk)
+            yield chunk
+
+        os.replace(tmp_path, path)
+        _JSON_CACHE.pop(path, None)
+    finally:
+        tmp_path.unlink(missing_ok=True)
 
 
 def _normalize_credentials_payload(credentials: dict[str, Any]) -> dict[str, Any]:
@@ -1,56 +1,272 @@
+import functools
+import hashlib
+import queue
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime, time, timezone
+from typing import NamedTuple
 
 from sqlalchemy import create_engine, inspect, text
-from sqlalchemy.exc import SQLAlchemyError
-from urllib.parse import quote_plus
+from sqlalchemy.engine import URL, make_url
+
+
+_DRIVER_OPTIONS = {
+    "postgresql": ("postgresql+psycopg2", {"sslmode": "require"}),
+    "mysql": ("mysql+pymysql", {}),
+    "sqlserver": ("mssql+pyodbc", {"driver": "ODBC Driver 17 for SQL Server"}),
+}
 
 
 def build_connection_url(db_type, host, port, database, username, password):
-    username = quote_plus(username)
-    password = quote_plus(password)
+    # URL.create escapes credentials itself and spares create_engine from
+    # re-parsing a DSN string; URL objects are also hashable cache keys.
+    if db_type not in _DRIVER_OPTIONS:
+        raise Exception("Unsupported database type")
 
-    if db_type == "postgresql":
-        return f"postgresql+psycopg2://{username}:{password}@{host}:{port}/{database}?sslmode=require"
+    drivername, query = _DRIVER_OPTIONS[db_type]
+    return URL.create(
+        drivername,
+        username=username,
+        password=password,
+        host=host,
+        port=port,
+        database=database,
+        query=query,
+    )
 
-    elif db_type == "mysql":
-        return f"mysql+pymysql://{username}:{password}@{host}:{port}/{database}"
 
-    elif db_type == "sqlserver":
-        return (
-            f"mssql+pyodbc://{username}:{password}@{host}:{port}/{database}"
-            "?driver=ODBC+Driver+17+for+SQL+Server"
-        )
+# Sized for the profiling fan-out plus a few concurrent API/chat requests.
+POOL_SIZE = 8
+POOL_MAX_OVERFLOW = 8
+POOL_TIMEOUT_SECONDS = 10
+POOL_RECYCLE_SECONDS = 300
 
-    else:
-        raise Exception("Unsupported database type")
-    
+_ENGINES = weakref.WeakSet()
 
-def create_engine_from_url(connection_url):
-    return create_engine(connection_url)
 
+# DataLens only ever reads from user databases; where the driver allows it,
+# sessions are opened read-only so a bad query cannot modify data. Sessions
+# also run in UTC so temporal values come back already normalized.
+_SESSION_CONNECT_ARGS = {
+    "postgresql": {
+        "options": "-c default_transaction_read_only=on -c TimeZone=UTC",
+    },
+    "mysql": {"init_command": "SET time_zone = '+00:00'"},
+}
+
+
+def create_engine_from_url(connection_url):
+    connection_url = make_url(connection_url)
+    engine = create_engine(
+        connection_url,
+        connect_args=_SESSION_CONNECT_ARGS.get(connection_url.get_backend_name(), {}),
+        pool_pre_ping=True,
+        pool_recycle=POOL_RECYCLE_SECONDS,
+        pool_use_lifo=True,
+        pool_size=POOL_SIZE,
+        max_overflow=POOL_MAX_OVERFLOW,
+        pool_timeout=POOL_TIMEOUT_SECONDS,
+    )
+    _ENGINES.add(engine)
+    return engine
+
+
+def warm_engine(engine):
+    # Checking a connection out and back in leaves it open in the pool, so
+    # the first real request skips the connect/auth/TLS handshake.
+    with engine.connect():
+        pass
+
+
+def _engine_id(engine):
+    # /healthz is unauthenticated, so engines are identified by a digest of
+    # their URL rather than the host, user and database it contains.
+    rendered = engine.url.render_as_string(hide_password=False)
+    return hashlib.blake2b(rendered.encode("utf-8"), digest_size=6).hexdigest()
+
+
+def pool_statistics():
+    return [
+        {
+            "id": _engine_id(engine),
+            "size": engine.pool.size(),
+            "checked_in": engine.pool.checkedin(),
+            "checked_out": engine.pool.checkedout(),
+            "overflow": engine.pool.overflow(),
+        }
+        for engine in list(_ENGINES)
+    ]
+
+
+@functools.lru_cache(maxsize=32)
+def get_engine(connection_url):
+    # One pooled engine per connection URL, shared by the API endpoints and
+    # the chat agent. Inspectors are not cached so reflection stays current.
+    return create_engine_from_url(connection_url)
+
+
+def dispose_engine(connection_url):
+    # Closes the pooled connections of any live engine for this URL without
+    # creating one; the engine itself reopens connections on next use.
+    connection_url = make_url(connection_url)
+    disposed = 0
+    for engine in list(_ENGINES):
+        if engine.url == connection_url:
+            engine.dispose()
+            disposed += 1
+    return disposed
+
+
+# Approximate profiling only samples tables whose catalog row estimate
+# exceeds this; smaller tables are cheap enough to count exactly.
+PROFILE_SAMPLE_MIN_ROWS = 100_000
+PROFILE_SAMPLE_PERCENT = 1
+PROFILE_SAMPLE_SEED = 42
+
+
+class _DialectSQL(NamedTuple):
+    count: str
+    count_where: str
+    current_schema: str | None = None
+    row_estimate: str | None = None
+    row_estimate_uses_quoted_name: bool = False
+    sample_source: str | None = None
+    # SQL Server rejects subqueries inside aggregates (Msg 130).
+    subquery_in_aggregate: bool = True
+    key_columns: str = (
+        # Key columns plus, for foreign keys, the referenced table/column.
+        "SELECT kcu.table_name, kcu.constraint_name, kcu.column_name, "
+        "ref.table_name, ref.column_name "
+        "FROM information_schema.key_column_usage kcu "
+        "LEFT JOIN information_schema.referential_constraints rc "
+        "ON rc.constraint_schema = kcu.constraint_schema "
+        "AND rc.constraint_name = kcu.constraint_name "
+        "LEFT JOIN information_schema.key_column_usage ref "
+        "ON ref.constraint_schema = rc.unique_constraint_schema "
+        "AND ref.constraint_name = rc.unique_constraint_name "
+        "AND ref.ordinal_position = kcu.ordinal_position "
+        "WHERE kcu.table_schema = {schema} "
+        "ORDER BY kcu.table_name, kcu.constraint_name, kcu.ordinal_position, "
+        "ref.table_name, ref.column_name"
+    )
+
+
+# Dialect-specific SQL fragments, resolved once per engine dialect so the
+# profiling queries can use each database's native fast paths.
+_GENERIC_SQL = _DialectSQL(
+    count="COUNT",
+    count_where="COALESCE(SUM(CASE WHEN {condition} THEN 1 ELSE 0 END), 0)",
+)
+_DIALECT_SQL = {
+    "postgresql": _DialectSQL(
+        count="COUNT",
+        count_where="COUNT(*) FILTER (WHERE {condition})",
+        current_schema="current_schema()",
+        row_estimate="SELECT reltuples FROM pg_class WHERE oid = to_regclass(:name)",
+        row_estimate_uses_quoted_name=True,
+        sample_source=(
+            f"{{table}} TABLESAMPLE SYSTEM ({PROFILE_SAMPLE_PERCENT}) "
+            f"REPEATABLE ({PROFILE_SAMPLE_SEED})"
+        ),
+    ),
+    "mysql": _GENERIC_SQL._replace(
+        current_schema="DATABASE()",
+        row_estimate=(
+            "SELECT TABLE_ROWS FROM information_schema.tables "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :name"
+        ),
+        sample_source=(
+            f"(SELECT * FROM {{table}} LIMIT {PROFILE_SAMPLE_MIN_ROWS}) "
+            "AS profile_sample"
+        ),
+        # MySQL names every primary key PRIMARY, so the referential join is
+        # ambiguous; key_column_usage carries the FK target directly.
+        key_columns=(
+            "SELECT table_name, constraint_name, column_name, "
+            "referenced_table_name, referenced_column_name "
+            "FROM information_schema.key_column_usage "
+            "WHERE table_schema = {schema} "
+            "ORDER BY table_name, constraint_name, ordinal_position"
+        ),
+    ),
+    "mssql": _GENERIC_SQL._replace(
+        count="COUNT_BIG",
+        subquery_in_aggregate=False,
+        current_schema="SCHEMA_NAME()",
+        row_estimate=(
+            "SELECT SUM(rows) FROM sys.partitions "
+            "WHERE object_id = OBJECT_ID(:name) AND index_id IN (0, 1)"
+        ),
+        row_estimate_uses_quoted_name=True,
+        sample_source=(
+            f"{{table}} TABLESAMPLE ({PROFILE_SAMPLE_PERCENT} PERCENT) "
+            f"REPEATABLE ({PROFILE_SAMPLE_SEED})"
+        ),
+    ),
+}
+
+
+def _dialect_sql(engine):
+    return _DIALECT_SQL.get(engine.dialect.name, _GENERIC_SQL)
+
+
+def schema_fingerprint(engine):
+    # A digest of column and key-constraint catalog rows; it changes whenever
+    # tables, columns, types, defaults, keys or FK targets change, at a
+    # fraction of reflection cost.
+    dialect_sql = _dialect_sql(engine)
+    current_schema = dialect_sql.current_schema
+    if current_schema is None:
+        return None
 
-def test_connection(connection_url):
-    try:
-        engine = create_engine(connection_url)
+    digest = hashlib.blake2b(digest_size=16)
+    with engine.connect().execution_options(stream_results=True) as conn:
+        for query in (
+            "SELECT table_name, column_name, data_type, is_nullable, "
+            "character_maximum_length, numeric_precision, numeric_scale, "
+            "datetime_precision, "
+            "column_default "
+            "FROM information_schema.columns "
+            f"WHERE table_schema = {current_schema} "
+            "ORDER BY table_name, ordinal_position",
+            dialect_sql.key_columns.format(schema=current_schema),
+        ):
+            for row in conn.execute(text(query)):
+                digest.update("\x1f".join(str(value) for value in row).encode("utf-8"))
+                digest.update(b"\x1e")
+    return digest.hexdigest()
+
+
+def _reflect_tables(inspector):
+    # Bulk reflection issues one catalog query per kind of metadata for the
+    # whole schema instead of three round trips per table.
+    tables = inspector.get_table_names()
+    multi_columns = inspector.get_multi_columns()
+    multi_pks = inspector.get_multi_pk_constraint()
+    multi_fks = inspector.get_multi_foreign_keys()
 
-        with engine.connect() as conn:
-            conn.execute(text("SELECT 1"))
+    reflected = []
+    for table in tables:
+        key = (None, table)
+        reflected.append(
+            (
+                table,
+                multi_columns.get(key, []),
+                (multi_pks.get(key) or {}).get("constrained_columns", []),
+                multi_fks.get(key, []),
+            )
+        )
+    return reflected
 
-        return True, "Connection successful"
 
-    except SQLAlchemyError as e:
-        return False, str(e)
-    
 def extract_schema(engine):
     inspector = inspect(engine)
 
     schema_data = []
 
-    tables = inspector.get_table_names()
-
-    for table in tables:
+    for table, table_columns, pk, foreign_keys in _reflect_tables(inspector):
         columns = []
-        for col in inspector.get_columns(table):
+        for col in table_columns:
             columns.append({
                 "name": col["name"],
                 "type": str(col["type"]),
@@ -58,10 +274,8 @@ def extract_schema(engine):
                 "default": str(col.get("default"))
             })
 
-        pk = inspector.get_pk_constraint(table).get("constrained_columns", [])
-
         fks = []
-        for fk in inspector.get_foreign_keys(table):
+        for fk in foreign_keys:
             fks.append({
                 "column": fk.get("constrained_columns"),
                 "referred_table": fk.get("referred_table"),
@@ -91,25 +305,15 @@ def _quoted_table(engine, table_name, schema_name=None):
 
 
 def _as_utc_datetime(value):
-    if value is None:
-        return None
-
+    # The drivers hand back date/datetime objects from UTC sessions, so no
+    # string parsing is needed; anything else (e.g. TIME) has no timestamp.
     if isinstance(value, datetime):
-        dt = value
-    elif isinstance(value, date):
-        dt = datetime.combine(value, time.min)
-    elif isinstance(value, str):
-        try:
-            dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
-        except ValueError:
-            return None
-    else:
-        return None
-
-    if dt.tzinfo is None:
-        return dt.replace(tzinfo=timezone.utc)
-
-    return dt.astimezone(timezone.utc)
+        if value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc)
+    if isinstance(value, date):
+        return datetime.combine(value, time.min, tzinfo=timezone.utc)
+    return None
 
 
 def _is_temporal_column(column_type):
@@ -117,237 +321,387 @@ def _is_temporal_column(column_type):
     return "date" in normalized or "time" in normalized
 
 
-def _pct(part, total):
-    if total == 0:
-        return None
-    return round((part / total) * 100, 2)
+PROFILE_COLUMNS_PER_QUERY = 100
+# Leaves overflow connections free for requests that arrive mid-profile.
+PROFILE_MAX_WORKERS = POOL_SIZE
 
 
-def extract_data_profile(engine):
-    inspector = inspect(engine)
-    profiles = []
-    now_utc = datetime.now(timezone.utc)
+def _column_aggregates(conn, quoted_table, function, quoted_columns, leading=()):
+    # One scan per chunk of columns instead of one scan per column; chunking
+    # keeps the select list well under dialect limits for very wide tables.
+    select_items = list(leading) + [
+        f"{function}({quoted_column})" for quoted_column in quoted_columns
+    ]
 
-    for table in inspector.get_table_names():
-        quoted_table = _quoted_table(engine, table)
-        columns = inspector.get_columns(table)
-        column_names = [col["name"] for col in columns]
-
-        with engine.connect() as conn:
-            total_rows = conn.execute(
-                text(f"SELECT COUNT(*) FROM {quoted_table}")
-            ).scalar_one()
-
-            column_stats = []
-            non_null_cells = 0
-            for column_name in column_names:
-                quoted_column = _quote_identifier(engine, column_name)
-                non_null_count = conn.execute(
-                    text(
-                        f"SELECT COUNT({quoted_column}) "
-                        f"FROM {quoted_table}"
-                    )
-                ).scalar_one()
-
-                null_count = total_rows - non_null_count
-                non_null_cells += non_null_count
-
-                column_stats.append(
-                    {
-                        "column": column_name,
-                        "non_null_count": non_null_count,
-                        "null_count": null_count,
-                        "completeness_pct": _pct(non_null_count, total_rows),
-                    }
-                )
+    values = []
+    for start in range(0, len(select_items), PROFILE_COLUMNS_PER_QUERY):
+        chunk = select_items[start : start + PROFILE_COLUMNS_PER_QUERY]
+        row = conn.execute(
+            text(f"SELECT {', '.join(chunk)} FROM {quoted_table}")
+        ).one()
+        values.extend(row)
+    return values
 
-            total_cells = total_rows * len(column_names)
-            completeness = {
-                "row_count": total_rows,
-                "column_count": len(column_names),
-                "non_null_cells": non_null_cells,
-                "null_cells": total_cells - non_null_cells,
-                "table_completeness_pct": _pct(non_null_cells, total_cells),
-                "columns": column_stats,
-            }
 
-            temporal_columns = [
-                col["name"] for col in columns if _is_temporal_column(col["type"])
-            ]
-            latest_timestamp = None
-            latest_column = None
-            freshness_columns = []
-
-            for column_name in temporal_columns:
-                quoted_column = _quote_identifier(engine, column_name)
-                max_value = conn.execute(
-                    text(f"SELECT MAX({quoted_column}) FROM {quoted_table}")
-                ).scalar_one()
-                parsed_value = _as_utc_datetime(max_value)
-
-                freshness_columns.append(
-                    {
-                        "column": column_name,
-                        "latest_value": parsed_value.isoformat()
-                        if parsed_value
-                        else None,
-                    }
-                )
-
-                if parsed_value and (
-                    latest_timestamp is None or parsed_value > latest_timestamp
-                ):
-                    latest_timestamp = parsed_value
-                    latest_column = column_name
-
-            freshness = {
-                "temporal_columns_checked": len(temporal_columns),
-                "latest_column": latest_column,
-                "latest_timestamp": latest_timestamp.isoformat()
-                if latest_timestamp
-                else None,
-                "staleness_days": round(
-                    (now_utc - latest_timestamp).total_seconds() / 86400, 2
-                )
-                if latest_timestamp
-                else None,
-                "columns": freshness_columns,
-            }
+def _estimated_row_count(conn, dialect_sql, table, quoted_table):
+    if dialect_sql.row_estimate is None:
+        return None
 
-            pk_columns = inspector.get_pk_constraint(table).get(
-                "constrained_columns", []
+    name = quoted_table if dialect_sql.row_estimate_uses_quoted_name else table
+    value = conn.execute(text(dialect_sql.row_estimate), {"name": name}).scalar()
+    if value is None or value < 0:
+        return None
+    return int(value)
+
+
+def _completeness_counts(conn, engine, table, quoted_table, quoted_columns, approximate):
+    dialect_sql = _dialect_sql(engine)
+    count_star = f"{dialect_sql.count}(*)"
+
+    if approximate and dialect_sql.sample_source is not None:
+        estimated_rows = _estimated_row_count(conn, dialect_sql, table, quoted_table)
+        if estimated_rows is not None and estimated_rows > PROFILE_SAMPLE_MIN_ROWS:
+            sample_source = dialect_sql.sample_source.format(table=quoted_table)
+            sample_rows, *sample_counts = _column_aggregates(
+                conn,
+                sample_source,
+                dialect_sql.count,
+                quoted_columns,
+                leading=(count_star,),
             )
-            if pk_columns:
-                null_condition = " OR ".join(
-                    f"{_quote_identifier(engine, col)} IS NULL" for col in pk_columns
-                )
-                duplicate_group_by = ", ".join(
-                    _quote_identifier(engine, col) for col in pk_columns
+            if sample_rows:
+                scale = estimated_rows / sample_rows
+                return (
+                    estimated_rows,
+                    [round(count * scale) for count in sample_counts],
+                    True,
                 )
 
-                pk_null_rows = conn.execute(
-                    text(
-                        f"SELECT COUNT(*) FROM {quoted_table} "
-                        f"WHERE {null_condition}"
-                    )
-                ).scalar_one()
-
-                pk_duplicate_groups = conn.execute(
-                    text(
-                        "SELECT COUNT(*) FROM ("
-                        f"SELECT {duplicate_group_by}, COUNT(*) AS dup_count "
-                        f"FROM {quoted_table} "
-                        f"GROUP BY {duplicate_group_by} "
-                        "HAVING COUNT(*) > 1"
-                        ") AS duplicate_groups"
-                    )
-                ).scalar_one()
-
-                pk_duplicate_rows = conn.execute(
-                    text(
-                        "SELECT COALESCE(SUM(dup_count - 1), 0) FROM ("
-                        f"SELECT COUNT(*) AS dup_count "
-                        f"FROM {quoted_table} "
-                        f"GROUP BY {duplicate_group_by} "
-                        "HAVING COUNT(*) > 1"
-                        ") AS duplicate_rows"
-                    )
-                ).scalar_one()
-            else:
-                pk_null_rows = None
-                pk_duplicate_groups = None
-                pk_duplicate_rows = None
-
-            fk_details = []
-            total_orphan_rows = 0
-            foreign_keys = inspector.get_foreign_keys(table)
-            for fk in foreign_keys:
-                local_cols = fk.get("constrained_columns", [])
-                referred_table = fk.get("referred_table")
-                referred_cols = fk.get("referred_columns", [])
-                referred_schema = fk.get("referred_schema")
-
-                if (
-                    not local_cols
-                    or not referred_table
-                    or not referred_cols
-                    or len(local_cols) != len(referred_cols)
-                ):
-                    continue
-
-                left_table = _quoted_table(engine, table)
-                right_table = _quoted_table(engine, referred_table, referred_schema)
-
-                join_conditions = " AND ".join(
-                    f"l.{_quote_identifier(engine, local_col)} = "
-                    f"p.{_quote_identifier(engine, referred_col)}"
-                    for local_col, referred_col in zip(local_cols, referred_cols)
-                )
+    total_rows, *non_null_counts = _column_aggregates(
+        conn, quoted_table, dialect_sql.count, quoted_columns, leading=(count_star,)
+    )
+    return total_rows, non_null_counts, False
 
-                local_has_value = " OR ".join(
-                    f"l.{_quote_identifier(engine, local_col)} IS NOT NULL"
-                    for local_col in local_cols
-                )
 
-                parent_missing = " AND ".join(
-                    f"p.{_quote_identifier(engine, referred_col)} IS NULL"
-                    for referred_col in referred_cols
-                )
+def _pct(part, total):
+    if total == 0:
+        return None
+    return round((part / total) * 100, 2)
 
-                orphan_rows = conn.execute(
-                    text(
-                        "SELECT COUNT(*) "
-                        f"FROM {left_table} AS l "
-                        f"LEFT JOIN {right_table} AS p "
-                        f"ON {join_conditions} "
-                        f"WHERE ({local_has_value}) "
-                        f"AND ({parent_missing})"
-                    )
-                ).scalar_one()
-
-                total_orphan_rows += orphan_rows
-                fk_details.append(
-                    {
-                        "local_columns": local_cols,
-                        "referred_table": referred_table,
-                        "referred_columns": referred_cols,
-                        "orphan_rows": orphan_rows,
-                    }
-                )
 
-            if pk_columns:
-                key_status = (
-                    "healthy"
-                    if pk_null_rows == 0
-                    and pk_duplicate_rows == 0
-                    and total_orphan_rows == 0
-                    else "issues_found"
-                )
-            else:
-                key_status = "missing_primary_key"
-
-            key_health = {
-                "status": key_status,
-                "primary_key": {
-                    "columns": pk_columns,
-                    "null_rows": pk_null_rows,
-                    "duplicate_groups": pk_duplicate_groups,
-                    "duplicate_rows": pk_duplicate_rows,
-                },
-                "foreign_keys": {
-                    "relationships_checked": len(fk_details),
-                    "orphan_rows": total_orphan_rows,
-                    "details": fk_details,
-                },
+def _orphan_count_sql(dialect_sql, quoted_table, conditions):
+    # Every relationship of the table is checked in one pass over the child
+    # rows, with NOT EXISTS letting the planner use an anti-join. Dialects
+    # that cannot aggregate over a subquery get one scalar count per FK.
+    if dialect_sql.subquery_in_aggregate:
+        counts = ", ".join(
+            dialect_sql.count_where.format(condition=condition)
+            for condition in conditions
+        )
+        return f"SELECT {counts} FROM {quoted_table} AS l"
+
+    counts = ", ".join(
+        f"(SELECT {dialect_sql.count}(*) FROM {quoted_table} AS l WHERE {condition})"
+        for condition in conditions
+    )
+    return f"SELECT {counts}"
+
+
+def _profile_table(
+    conn, engine, table, columns, pk_columns, foreign_keys, now_utc, approximate=False
+):
+    quoted_table = _quoted_table(engine, table)
+    column_names = [col["name"] for col in columns]
+    quote = engine.dialect.identifier_preparer.quote
+    quoted = {column_name: quote(column_name) for column_name in column_names}
+    dialect_sql = _dialect_sql(engine)
+
+    total_rows, non_null_counts, estimated = _completeness_counts(
+        conn,
+        engine,
+        table,
+        quoted_table,
+        list(quoted.values()),
+        approximate,
+    )
+
+    column_stats = []
+    non_null_cells = 0
+    for column_name, non_null_count in zip(column_names, non_null_counts):
+        null_count = total_rows - non_null_count
+        non_null_cells += non_null_count
+
+        column_stats.append(
+            {
+                "column": column_name,
+                "non_null_count": non_null_count,
+                "null_count": null_count,
+                "completeness_pct": _pct(non_null_count, total_rows),
             }
+        )
+
+    total_cells = total_rows * len(column_names)
+    completeness = {
+        "row_count": total_rows,
+        "column_count": len(column_names),
+        "non_null_cells": non_null_cells,
+        "null_cells": total_cells - non_null_cells,
+        "table_completeness_pct": _pct(non_null_cells, total_cells),
+        "estimated": estimated,
+        "columns": column_stats,
+    }
+
+    temporal_columns = [
+        col["name"] for col in columns if _is_temporal_column(col["type"])
+    ]
+    max_values = _column_aggregates(
+        conn,
+        quoted_table,
+        "MAX",
+        [quoted[column_name] for column_name in temporal_columns],
+    )
+    parsed_values = [_as_utc_datetime(max_value) for max_value in max_values]
+    freshness_columns = [
+        {
+            "column": column_name,
+            "latest_value": parsed_value.isoformat() if parsed_value else None,
+        }
+        for column_name, parsed_value in zip(temporal_columns, parsed_values)
+    ]
+
+    latest_timestamp = None
+    latest_column = None
+    dated_columns = [
+        (parsed_value, column_name)
+        for column_name, parsed_value in zip(temporal_columns, parsed_values)
+        if parsed_value
+    ]
+    if dated_columns:
+        latest_timestamp, latest_column = max(
+            dated_columns, key=lambda item: item[0]
+        )
+
+    freshness = {
+        "temporal_columns_checked": len(temporal_columns),
+        "latest_column": latest_column,
+        "latest_timestamp": latest_timestamp.isoformat()
+        if latest_timestamp
+        else None,
+        "staleness_days": round(
+            (now_utc - latest_timestamp).total_seconds() / 86400, 2
+        )
+        if latest_timestamp
+        else None,
+        "columns": freshness_columns,
+    }
+
+    if pk_columns:
+        null_condition = " OR ".join(
+            f"{quoted[col]} IS NULL" for col in pk_columns
+        )
+        duplicate_group_by = ", ".join(
+            quoted[col] for col in pk_columns
+        )
+
+        # Null keys, duplicate groups and surplus rows all come from a
+        # single GROUP BY pass over the key columns.
+        pk_health_row = conn.execute(
+            text(
+                "SELECT "
+                f"COALESCE(SUM(CASE WHEN {null_condition} THEN dup_count ELSE 0 END), 0), "
+                f"{dialect_sql.count_where.format(condition='dup_count > 1')}, "
+                "COALESCE(SUM(CASE WHEN dup_count > 1 THEN dup_count - 1 ELSE 0 END), 0) "
+                "FROM ("
+                f"SELECT {duplicate_group_by}, {dialect_sql.count}(*) AS dup_count "
+                f"FROM {quoted_table} "
+                f"GROUP BY {duplicate_group_by}"
+                ") AS pk_groups"
+            )
+        ).one()
+        pk_null_rows, pk_duplicate_groups, pk_duplicate_rows = (
+            int(value) for value in pk_health_row
+        )
+    else:
+        pk_null_rows = None
+        pk_duplicate_groups = None
+        pk_duplicate_rows = None
+
+    checked_fks = []
+    orphan_conditions = []
+    for fk in foreign_keys:
+        local_cols = fk.get("constrained_columns", [])
+        referred_table = fk.get("referred_table")
+        referred_cols = fk.get("referred_columns", [])
+        referred_schema = fk.get("referred_schema")
+
+        if (
+            not local_cols
+            or not referred_table
+            or not referred_cols
+            or len(local_cols) != len(referred_cols)
+        ):
+            continue
+
+        right_table = _quoted_table(engine, referred_table, referred_schema)
+
+        join_conditions = " AND ".join(
+            f"p.{quote(referred_col)} = l.{quoted[local_col]}"
+            for local_col, referred_col in zip(local_cols, referred_cols)
+        )
+
+        local_has_value = " OR ".join(
+            f"l.{quoted[local_col]} IS NOT NULL"
+            for local_col in local_cols
+        )
+
+        checked_fks.append((local_cols, referred_table, referred_cols))
+        orphan_conditions.append(
+            f"({local_has_value}) AND NOT EXISTS ("
+            f"SELECT 1 FROM {right_table} AS p WHERE {join_conditions})"
+        )
 
-        profiles.append(
+    orphan_counts = []
+    if orphan_conditions:
+        orphan_counts = conn.execute(
+            text(_orphan_count_sql(dialect_sql, quoted_table, orphan_conditions))
+        ).one()
+
+    fk_details = []
+    total_orphan_rows = 0
+    for (local_cols, referred_table, referred_cols), orphan_rows in zip(
+        checked_fks, orphan_counts
+    ):
+        orphan_rows = int(orphan_rows)
+        total_orphan_rows += orphan_rows
+        fk_details.append(
             {
-                "table_name": table,
-                "completeness": completeness,
-                "freshness": freshness,
-                "key_health": key_health,
+                "local_columns": local_cols,
+                "referred_table": referred_table,
+                "referred_columns": referred_cols,
+                "orphan_rows": orphan_rows,
             }
         )
 
-    return profiles
+    if pk_columns:
+        key_status = (
+            "healthy"
+            if pk_null_rows == 0
+            and pk_duplicate_rows == 0
+            and total_orphan_rows == 0
+            else "issues_found"
+        )
+    else:
+        key_status = "missing_primary_key"
+
+    key_health = {
+        "status": key_status,
+        "primary_key": {
+            "columns": pk_columns,
+            "null_rows": pk_null_rows,
+            "duplicate_groups": pk_duplicate_groups,
+            "duplicate_rows": pk_duplicate_rows,
+        },
+        "foreign_keys": {
+            "relationships_checked": len(fk_details),
+            "orphan_rows": total_orphan_rows,
+            "details": fk_details,
+        },
+    }
+
+    return {
+        "table_name": table,
+        "completeness": completeness,
+        "freshness": freshness,
+        "key_health": key_health,
+    }
+
+
+def reflect_profile_tables(engine):
+    # Inspector caches are not thread-safe, so metadata is reflected up front
+    # and only the per-table profiling queries fan out to workers.
+    return _reflect_tables(inspect(engine))
+
+
+def profile_tables_from_schema(schema):
+    # Rebuilds profiling metadata from a stored extract_schema() result so a
+    # fresh schema.json spares another pass over the catalog.
+    return [
+        (
+            table["table_name"],
+            table["columns"],
+            table["primary_keys"] or [],
+            [
+                {
+                    "constrained_columns": fk["column"] or [],
+                    "referred_table": fk["referred_table"],
+                    "referred_columns": fk["referred_columns"] or [],
+                }
+                for fk in table["foreign_keys"]
+            ],
+        )
+        for table in schema
+    ]
+
+
+def iter_data_profile(engine, approximate=False, table_metadata=None):
+    if table_metadata is None:
+        table_metadata = reflect_profile_tables(engine)
+    if not table_metadata:
+        return
+
+    now_utc = datetime.now(timezone.utc)
+    work_queue = queue.SimpleQueue()
+    for index, metadata in enumerate(table_metadata):
+        work_queue.put((index, metadata))
+    results = queue.SimpleQueue()
+
+    def profile_worker():
+        # Each worker holds one pooled connection for all the tables it
+        # profiles; ending the transaction per table keeps snapshots short.
+        # Profiling SQL is unique per table, so it bypasses the compiled
+        # cache rather than evicting statements that are actually reused.
+        try:
+            with engine.connect().execution_options(compiled_cache=None) as conn:
+                while True:
+                    try:
+                        index, metadata = work_queue.get_nowait()
+                    except queue.Empty:
+                        return
+                    try:
+                        profile = _profile_table(
+                            conn, engine, *metadata, now_utc, approximate
+                        )
+                        results.put((index, profile, None))
+                    finally:
+                        conn.rollback()
+        except Exception as exc:
+            results.put((None, None, exc))
+
+    max_workers = min(PROFILE_MAX_WORKERS, len(table_metadata))
+    with ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="profile"
+    ) as executor:
+        for _ in range(max_workers):
+            executor.submit(profile_worker)
+
+        # Profiles are yielded in table order as soon as each one is ready.
+        try:
+            pending = {}
+            for next_index in range(len(table_metadata)):
+                while next_index not in pending:
+                    index, profile, error = results.get()
+                    if error is not None:
+                        raise error
+                    pending[index] = profile
+                yield pending.pop(next_index)
+        finally:
+            # Stop handing out tables if the consumer failed or went away.
+            while True:
+                try:
+                    work_queue.get_nowait()
+                except queue.Empty:
+                    break
+
+
+def extract_data_profile(engine, approximate=False, table_metadata=None):
+    return list(iter_data_profile(engine, approximate, table_metadata))
@@ -0,0 +1,27 @@
+import os
+import re
+from pathlib import Path
+
+_ENV_LINE_PATTERN = re.compile(
+    r"""^[ \t]*(?:export[ \t]+)?([A-Za-z_][A-Za-z0-9_]*)[ \t]*=[ \t]*"""
+    r"""(?:"([^"\n]*)"|'([^'\n]*)'|([^\n]*?))[ \t]*\r?$""",
+    re.MULTILINE,
+)
+
+
+def load_env_file(path: Path) -> None:
+    if not path.exists():
+        return
+
+    text = path.read_text(encoding="utf-8")
+    for match in _ENV_LINE_PATTERN.finditer(text):
+        key, double_quoted, single_quoted, bare = match.groups()
+        if key in os.environ:
+            continue
+
+        if double_quoted is not None:
+            os.environ[key] = double_quoted
+        elif single_quoted is not None:
+            os.environ[key] = single_quoted
+        else:
+            os.environ[key] = bare
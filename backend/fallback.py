@@ -0,0 +1,359 @@
+import re
+from typing import Any, Callable
+
+from data_store import (
+    get_doc_file,
+    get_profiling_file,
+    get_schema_file,
+    read_json,
+    slugify_database_name,
+)
+
+
+_QUERY_WORD_RE = re.compile(r"\w+")
+_NON_WORD_RE = re.compile(r"\W")
+
+# Per-database lookup of lowercased table names, rebuilt only when read_json
+# hands back a different schema list (i.e. schema.json changed on disk).
+TableNameIndex = tuple[
+    list[str], dict[str, tuple[int, str]], list[tuple[int, str, str]]
+]
+FallbackHandler = Callable[
+    [str, list[Any], list[str], dict[str, Any]], str | None
+]
+
+_TABLE_NAME_INDEX: dict[str, tuple[list[Any], TableNameIndex]] = {}
+
+
+def _table_name_index(database: str, schema_rows: list[Any]) -> TableNameIndex:
+    cached = _TABLE_NAME_INDEX.get(database)
+    if cached is not None and cached[0] is schema_rows:
+        return cached[1]
+
+    table_names = [
+        str(item.get("table_name"))
+        for item in schema_rows
+        if isinstance(item, dict) and item.get("table_name")
+    ]
+    # Names keep their schema position so the earliest table wins, as it did
+    # with the plain substring scan.
+    word_names: dict[str, tuple[int, str]] = {}
+    other_names: list[tuple[int, str, str]] = []
+    for position, name in enumerate(table_names):
+        lowered = name.lower()
+        if _NON_WORD_RE.search(lowered):
+            other_names.append((position, lowered, name))
+        else:
+            word_names.setdefault(lowered, (position, name))
+
+    index: TableNameIndex = (table_names, word_names, other_names)
+    _TABLE_NAME_INDEX[database] = (schema_rows, index)
+    return index
+
+
+# Per-database {table_name: row} lookups over the schema, profile and doc
+# lists, reused for as long as read_json returns the same list objects.
+_ROW_INDEXES: dict[tuple[str, str], tuple[list[Any], dict[Any, dict[str, Any]]]] = {}
+
+
+def _rows_by_table_name(
+    database: str, kind: str, rows: list[Any]
+) -> dict[Any, dict[str, Any]]:
+    cached = _ROW_INDEXES.get((database, kind))
+    if cached is not None and cached[0] is rows:
+        return cached[1]
+
+    index: dict[Any, dict[str, Any]] = {}
+    for row in rows:
+        if isinstance(row, dict) and row.get("table_name"):
+            index.setdefault(row["table_name"], row)
+    _ROW_INDEXES[(database, kind)] = (rows, index)
+    return index
+
+
+def forget_fallback_indexes(database_slug: str) -> None:
+    # Drops the indexes (and the JSON lists they pin) for a database whose
+    # files were deleted or evicted. Keys are the names the chat was given.
+    for database in [
+        key for key in _TABLE_NAME_INDEX if slugify_database_name(key) == database_slug
+    ]:
+        _TABLE_NAME_INDEX.pop(database, None)
+    for key in [
+        key for key in _ROW_INDEXES if slugify_database_name(key[0]) == database_slug
+    ]:
+        _ROW_INDEXES.pop(key, None)
+
+
+def _word_variants(word: str) -> tuple[str, ...]:
+    # Singular/plural spellings, so "orders" still finds table `order` and
+    # "customer" finds `customers`.
+    variants = [word, word + "s", word + "es"]
+    if word.endswith("ies"):
+        variants.append(word[:-3] + "y")
+    elif word.endswith("y"):
+        variants.append(word[:-1] + "ies")
+    if word.endswith("es"):
+        variants.append(word[:-2])
+    if word.endswith("s"):
+        variants.append(word[:-1])
+    return tuple(variants)
+
+
+def _match_table_name(
+    query: str,
+    word_names: dict[str, tuple[int, str]],
+    other_names: list[tuple[int, str, str]],
+) -> str | None:
+    best: tuple[int, str] | None = None
+    for word in _QUERY_WORD_RE.findall(query):
+        for variant in _word_variants(word):
+            hit = word_names.get(variant)
+            if hit is not None and (best is None or hit < best):
+                best = hit
+    for position, lowered, name in other_names:
+        if best is not None and best[0] < position:
+            break
+        if lowered in query:
+            best = (position, name)
+            break
+    return best[1] if best is not None else None
+
+
+def _fallback_list_tables(
+    database: str,
+    schema_rows: list[Any],
+    table_names: list[str],
+    doc_payload: dict[str, Any],
+) -> str | None:
+    if not table_names:
+        return (
+            "Gemini quota is temporarily exhausted. I cannot call the LLM right now, "
+            "and no schema table list is available in local files."
+        )
+    preview = ", ".join(table_names[:50])
+    more = "" if len(table_names) <= 50 else f" ... (+{len(table_names) - 50} more)"
+    return (
+        "Gemini quota is temporarily exhausted, so this is a file-based answer.\n"
+        f"Database `{database}` has {len(table_names)} table(s): {preview}{more}"
+    )
+
+
+def _fallback_table_count(
+    database: str,
+    schema_rows: list[Any],
+    table_names: list[str],
+    doc_payload: dict[str, Any],
+) -> str | None:
+    return (
+        "Gemini quota is temporarily exhausted, so this is a file-based answer.\n"
+        f"Database `{database}` has {len(table_names)} table(s)."
+    )
+
+
+def _fallback_column_count(
+    database: str,
+    schema_rows: list[Any],
+    table_names: list[str],
+    doc_payload: dict[str, Any],
+) -> str | None:
+    total_columns = sum(
+        len(item.get("columns", []))
+        for item in schema_rows
+        if isinstance(item, dict) and isinstance(item.get("columns"), list)
+    )
+    return (
+        "Gemini quota is temporarily exhausted, so this is a file-based answer.\n"
+        f"Database `{database}` has {total_columns} column(s) across schema tables."
+    )
+
+
+def _fallback_relations(
+    database: str,
+    schema_rows: list[Any],
+    table_names: list[str],
+    doc_payload: dict[str, Any],
+) -> str | None:
+    relation_count = sum(
+        len(item.get("foreign_keys", []))
+        for item in schema_rows
+        if isinstance(item, dict) and isinstance(item.get("foreign_keys"), list)
+    )
+    return (
+        "Gemini quota is temporarily exhausted, so this is a file-based answer.\n"
+        f"Database `{database}` has {relation_count} foreign-key relationship(s)."
+    )
+
+
+def _fallback_recommendations(
+    database: str,
+    schema_rows: list[Any],
+    table_names: list[str],
+    doc_payload: dict[str, Any],
+) -> str | None:
+    recommendations = (
+        doc_payload.get("overview", {}).get("global_recommendations", [])
+        if isinstance(doc_payload, dict)
+        else []
+    )
+    if isinstance(recommendations, list) and recommendations:
+        lines = "\n".join(f"- {item}" for item in recommendations[:8])
+        return (
+            "Gemini quota is temporarily exhausted, so this is a file-based answer.\n"
+            f"Global recommendations for `{database}`:\n{lines}"
+        )
+    return None
+
+
+def _fallback_overview(
+    database: str,
+    schema_rows: list[Any],
+    table_names: list[str],
+    doc_payload: dict[str, Any],
+) -> str | None:
+    summary = (
+        doc_payload.get("overview", {}).get("summary")
+        if isinstance(doc_payload, dict)
+        else None
+    )
+    if summary:
+        return (
+            "Gemini quota is temporarily exhausted, so this is a file-based answer.\n"
+            f"Overview for `{database}`:\n{summary}"
+        )
+    return None
+
+
+# Handlers in priority order; one that returns None falls through to the next
+# matched intent and finally to the table-name lookup.
+_FALLBACK_HANDLERS: dict[str, FallbackHandler] = {
+    "list_tables": _fallback_list_tables,
+    "table_count": _fallback_table_count,
+    "column_count": _fallback_column_count,
+    "relations": _fallback_relations,
+    "recommendations": _fallback_recommendations,
+    "overview": _fallback_overview,
+}
+_FALLBACK_INTENTS: dict[str, str] = {
+    "list tables": "list_tables",
+    "table names": "list_tables",
+    "what tables": "list_tables",
+    "show tables": "list_tables",
+    "how many tables": "table_count",
+    "table count": "table_count",
+    "how many columns": "column_count",
+    "column count": "column_count",
+    "relation": "relations",
+    "foreign key": "relations",
+    "recommendation": "recommendations",
+    "summary": "overview",
+    "overview": "overview",
+    "describe database": "overview",
+}
+_FALLBACK_INTENT_RE = re.compile(
+    "|".join(
+        re.escape(keyword) for keyword in sorted(_FALLBACK_INTENTS, key=len, reverse=True)
+    )
+)
+
+
+def fallback_database_reply(database: str, message: str) -> str:
+    try:
+        schema_payload = read_json(get_schema_file(database))
+    except Exception:
+        schema_payload = {}
+
+    try:
+        profiling_payload = read_json(get_profiling_file(database))
+    except Exception:
+        profiling_payload = {}
+
+    try:
+        doc_payload = read_json(get_doc_file(database))
+    except Exception:
+        doc_payload = {}
+
+    schema_rows = schema_payload.get("schema", []) if isinstance(schema_payload, dict) else []
+    profile_rows = (
+        profiling_payload.get("profile", [])
+        if isinstance(profiling_payload, dict)
+        else []
+    )
+    doc_rows = doc_payload.get("tables", []) if isinstance(doc_payload, dict) else []
+
+    query = message.strip().lower()
+
+    table_names, word_names, other_names = _table_name_index(database, schema_rows)
+
+    intents = {
+        _FALLBACK_INTENTS[match.group()]
+        for match in _FALLBACK_INTENT_RE.finditer(query)
+    }
+    for intent, handler in _FALLBACK_HANDLERS.items():
+        if intent in intents:
+            reply = handler(database, schema_rows, table_names, doc_payload)
+            if reply is not None:
+                return reply
+
+    target_table = _match_table_name(query, word_names, other_names)
+
+    if target_table:
+        schema_entry = _rows_by_table_name(database, "schema", schema_rows).get(
+            target_table, {}
+        )
+        profile_entry = _rows_by_table_name(database, "profile", profile_rows).get(
+            target_table, {}
+        )
+        doc_entry = _rows_by_table_name(database, "doc", doc_rows).get(target_table, {})
+
+        column_count = (
+            len(schema_entry.get("columns", []))
+            if isinstance(schema_entry.get("columns"), list)
+            else 0
+        )
+        pk_count = (
+            len(schema_entry.get("primary_keys", []))
+            if isinstance(schema_entry.get("primary_keys"), list)
+            else 0
+        )
+        fk_count = (
+            len(schema_entry.get("foreign_keys", []))
+            if isinstance(schema_entry.get("foreign_keys"), list)
+            else 0
+        )
+        completeness = (
+            profile_entry.get("completeness", {}).get("table_completeness_pct")
+            if isinstance(profile_entry, dict)
+            else None
+        )
+        freshness = (
+            profile_entry.get("freshness", {}).get("latest_timestamp")
+            if isinstance(profile_entry, dict)
+            else None
+        )
+        priority = doc_entry.get("priority") if isinstance(doc_entry, dict) else None
+        business_summary = (
+            doc_entry.get("business_summary") if isinstance(doc_entry, dict) else None
+        )
+
+        lines = [
+            "Gemini quota is temporarily exhausted, so this is a file-based answer.",
+            f"Table `{target_table}`:",
+            f"- Columns: {column_count}",
+            f"- Primary keys: {pk_count}",
+            f"- Foreign keys: {fk_count}",
+        ]
+        if completeness is not None:
+            lines.append(f"- Completeness: {completeness}%")
+        if freshness:
+            lines.append(f"- Latest timestamp: {freshness}")
+        if priority:
+            lines.append(f"- Priority: {priority}")
+        if business_summary:
+            lines.append(f"- Business summary: {business_summary}")
+        return "\n".join(lines)
+
+    return (
+        "Gemini quota is temporarily exhausted, so I cannot use the AI model right now. "
+        "I can still answer deterministic questions like: list tables, table counts, "
+        "column counts, relations, overview summary, recommendations, or details for a specific table name."
+    )
@@ -1,29 +1,50 @@
 #import libraries
+import asyncio
+import functools
+import hashlib
+import io
 import os
-import shutil
-import uuid
+import secrets
 from decimal import Decimal
+from operator import itemgetter
 from pathlib import Path
 from typing import Literal
 
-from fastapi.encoders import jsonable_encoder
-from fastapi import FastAPI, HTTPException
+import anyio
+import orjson
+from anyio import to_thread
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Request
+from fastapi.concurrency import iterate_in_threadpool, run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, ORJSONResponse, Response, StreamingResponse
 from google.adk.runners import Runner
 from google.adk.sessions import InMemorySessionService
 from google.genai import types as genai_types
 from pydantic import BaseModel
 from ai import generate_business_document
-from chat_agent.agent import root_agent, set_active_database
+from fallback import fallback_database_reply, forget_fallback_indexes
+from chat_agent.agent import get_root_agent, set_active_database
 from db import (
     build_connection_url,
-    create_engine_from_url,
-    test_connection,
+    dispose_engine,
+    get_engine,
+    pool_statistics,
+    warm_engine,
+    reflect_profile_tables,
+    profile_tables_from_schema,
+    schema_fingerprint,
     extract_schema,
     extract_data_profile,
+    iter_data_profile,
 )
 from data_store import (
+    CREDENTIALS_FILENAME,
     DATA_DIR,
+    DOC_FILENAME,
+    META_FILENAME,
+    PROFILING_FILENAME,
+    SCHEMA_FILENAME,
+    forget_cached_json,
     get_database_dir,
     get_credentials_file,
     get_doc_file,
@@ -31,13 +52,49 @@ from data_store import (
     get_schema_file,
     load_credentials,
     read_json,
+    record_table_count,
+    recorded_table_count,
     save_credentials,
     slugify_database_name,
-    write_json,
+    stream_json,
+    write_json_bytes,
 )
 
-app = FastAPI()
+
+def _decimal_encoder(value: Decimal):
+    if value == value.to_integral_value():
+        return int(value)
+    return float(value)
+
+
+def _orjson_default(value):
+    if isinstance(value, Decimal):
+        return _decimal_encoder(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def _dump_json(payload) -> bytes:
+    return orjson.dumps(payload, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _json_bytes_response(body: bytes) -> Response:
+    return Response(content=body, media_type="application/json")
+
+
+class DataLensJSONResponse(ORJSONResponse):
+    # orjson encodes datetimes natively; Decimals from aggregate queries go
+    # through _orjson_default, so payloads need no jsonable_encoder pass.
+    def render(self, content) -> bytes:
+        return _dump_json(content)
+
+
+app = FastAPI(default_response_class=DataLensJSONResponse)
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DATA_DIR_RELATIVE = DATA_DIR.relative_to(PROJECT_ROOT).as_posix()
+THREADPOOL_TOKENS = 128
+_PROFILE_LOCKS: dict[str, asyncio.Lock] = {}
+_DELETING_MARKER = ".deleting."
+_BACKGROUND_TASKS: set[asyncio.Task] = set()
 
 # CORS: allow localhost by default; add production frontend via CORS_ORIGINS (comma-separated)
 _default_origins = [
@@ -59,21 +116,85 @@ app.add_middleware(
 )
 
 
+def _remove_tree(path: Path | str) -> None:
+    # Database folders hold a few flat files; the DirEntry type from scandir
+    # replaces shutil.rmtree's per-entry lstat. Failures are left for the
+    # startup sweep rather than raised from a background task.
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    _remove_tree(entry.path)
+                else:
+                    os.unlink(entry.path)
+        os.rmdir(path)
+    except OSError:
+        pass
+
+
 @app.on_event("startup")
 def ensure_data_dir():
     """Create data directory on startup so the app works on fresh deploys (e.g. Render)."""
     DATA_DIR.mkdir(parents=True, exist_ok=True)
+    # Sweep folders whose background removal was cut short by a restart.
+    for leftover in DATA_DIR.glob(f".*{_DELETING_MARKER}*"):
+        _remove_tree(leftover)
 
 
-@app.get("/")
-@app.get("/health")
-def health():
-    """Health check for load balancers and deployment platforms."""
-    return {
+@app.on_event("startup")
+async def configure_threadpool():
+    """Raise the worker-thread limit so long profiling runs cannot starve sync endpoints."""
+    to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_TOKENS
+
+
+def _warm_database_engine(database_dir: Path) -> None:
+    credentials = read_json(database_dir / CREDENTIALS_FILENAME)
+    warm_engine(_profile_engine(credentials["database"]))
+
+
+async def _warm_saved_engines() -> None:
+    database_dirs = await run_in_threadpool(_list_database_dirs)
+    # A database that is down or has stale credentials must not affect the
+    # others, so failures are collected rather than raised.
+    await asyncio.gather(
+        *(run_in_threadpool(_warm_database_engine, entry) for entry in database_dirs),
+        return_exceptions=True,
+    )
+
+
+@app.on_event("startup")
+async def warm_engine_pools():
+    """Pre-open one pooled connection per saved database without delaying startup."""
+    if os.getenv("WARM_ENGINE_POOLS", "1") == "0":
+        return
+    task = asyncio.create_task(_warm_saved_engines())
+    _BACKGROUND_TASKS.add(task)
+    task.add_done_callback(_BACKGROUND_TASKS.discard)
+
+
+_HEALTH_BODY = orjson.dumps(
+    {
         "status": "ok",
         "service": "DataLens API",
         "docs": "/docs",
-        "endpoints": ["/databases", "/health"],
+        "endpoints": ["/databases", "/health", "/healthz"],
+    }
+)
+
+
+@app.get("/", include_in_schema=False)
+@app.get("/health", include_in_schema=False)
+async def health():
+    """Health check for load balancers and deployment platforms."""
+    return _json_bytes_response(_HEALTH_BODY)
+
+
+@app.get("/healthz")
+def health_with_pools():
+    """Health check that also reports connection pool usage per database engine."""
+    return {
+        "status": "ok",
+        "pools": pool_statistics(),
     }
 
 
@@ -90,310 +211,255 @@ class DatabaseTriggerRequest(BaseModel):
     database: str
 
 
+class SchemaExtractRequest(DatabaseTriggerRequest):
+    refresh: bool = False
+    summary: bool = False
+
+
+class ProfileRequest(DatabaseTriggerRequest):
+    approximate: bool = False
+    stream: bool = False
+    summary: bool = False
+
+
+class OverviewRequest(DatabaseTriggerRequest):
+    section: Literal["schema", "profiling", "doc"] | None = None
+
+
+class ExtractAllRequest(DatabaseTriggerRequest):
+    refresh: bool = False
+    approximate: bool = False
+
+
 class ChatMessageRequest(BaseModel):
     database: str
     message: str
     session_id: str | None = None
     user_id: str = "datalens-ui"
+    stream: bool = False
 
 
 CHAT_APP_NAME = "datalens-db-chat"
 CHAT_SESSION_SERVICE = InMemorySessionService()
-CHAT_RUNNER = Runner(
-    app_name=CHAT_APP_NAME,
-    agent=root_agent,
-    session_service=CHAT_SESSION_SERVICE,
+_CHAT_PROMPT_HEAD = "Active database is '"
+_CHAT_PROMPT_TAIL = (
+    "'. Use this database context unless user explicitly asks to switch.\n\n"
+    "User query:\n"
 )
+_ACTIVE_CHAT_DATABASE: str | None = None
+_ACTIVE_CHAT_DATABASE_LOCK = asyncio.Lock()
 
 
-def _decimal_encoder(value: Decimal):
-    if value == value.to_integral_value():
-        return int(value)
-    return float(value)
+@functools.lru_cache(maxsize=1)
+def _get_chat_runner() -> Runner:
+    return Runner(
+        app_name=CHAT_APP_NAME,
+        agent=get_root_agent(),
+        session_service=CHAT_SESSION_SERVICE,
+    )
 
 
-def _to_json_safe(payload: dict) -> dict:
-    return jsonable_encoder(payload, custom_encoder={Decimal: _decimal_encoder})
+def _read_cached_schema(schema_file: Path, database: str, fingerprint: str | None):
+    # Reuse the stored extraction while the live catalog fingerprint matches.
+    if fingerprint is None:
+        return None
+    try:
+        cached = read_json(schema_file)
+    except (FileNotFoundError, ValueError):
+        return None
+    if (
+        cached.get("database") != database
+        or cached.get("schema_fingerprint") != fingerprint
+    ):
+        return None
+    return cached
 
 
+@functools.lru_cache(maxsize=2048)
 def _relative_path(path: Path) -> str:
     return path.relative_to(PROJECT_ROOT).as_posix()
 
 
 def _safe_read(path: Path):
-    if not path.exists():
-        return None
+    # read_json serves unchanged files from its mtime-keyed cache, so this is
+    # a single stat per file once the listing is warm.
     try:
         return read_json(path)
     except Exception:
         return None
 
 
+def _listed_file(
+    file_entry: os.DirEntry | None, meta: dict, key: str
+) -> tuple[bool, int]:
+    # Returns (file is readable, tables listed under `key`). A meta.json
+    # entry for the file's current version spares parsing the whole file.
+    if file_entry is None:
+        return False, 0
+
+    path = Path(file_entry.path)
+    recorded = recorded_table_count(path, file_entry.stat(), meta)
+    if recorded is not None:
+        return True, recorded
+
+    payload = _safe_read(path)
+    if payload is None:
+        return False, 0
+    tables = payload.get(key, [])
+    return True, len(tables) if isinstance(tables, list) else 0
+
+
 def _extract_event_text(event) -> str:
     content = getattr(event, "content", None)
     parts = getattr(content, "parts", None) if content else None
     if not parts:
         return ""
 
-    chunks = []
+    if len(parts) == 1:
+        value = getattr(parts[0], "text", None)
+        return str(value).strip() if value else ""
+
+    buffer = io.StringIO()
     for part in parts:
         value = getattr(part, "text", None)
         if value:
-            chunks.append(str(value))
-    return "".join(chunks).strip()
-
+            buffer.write(str(value))
+    return buffer.getvalue().strip()
+
+
+def _list_database_dirs() -> list[Path]:
+    if not DATA_DIR.exists():
+        return []
+    with os.scandir(DATA_DIR) as entries:
+        return [
+            Path(entry.path)
+            for entry in entries
+            if not entry.name.startswith(".") and entry.is_dir(follow_symlinks=False)
+        ]
 
-def _fallback_database_reply(database: str, message: str) -> str:
-    try:
-        schema_payload = read_json(get_schema_file(database))
-    except Exception:
-        schema_payload = {}
 
+def _scan_database_dir(entry: Path) -> tuple[Path, dict[str, os.DirEntry]] | None:
+    # One directory scan answers every existence check for the folder; the
+    # stat results are cached on each DirEntry for the ETag and the summary.
+    # Folders deleted mid-scan are skipped.
     try:
-        profiling_payload = read_json(get_profiling_file(database))
-    except Exception:
-        profiling_payload = {}
-
-    try:
-        doc_payload = read_json(get_doc_file(database))
-    except Exception:
-        doc_payload = {}
-
-    schema_rows = schema_payload.get("schema", []) if isinstance(schema_payload, dict) else []
-    profile_rows = (
-        profiling_payload.get("profile", [])
-        if isinstance(profiling_payload, dict)
-        else []
-    )
-    doc_rows = doc_payload.get("tables", []) if isinstance(doc_payload, dict) else []
-
-    query = message.strip().lower()
+        with os.scandir(entry) as files:
+            present = {
+                file_entry.name: file_entry
+                for file_entry in files
+                if file_entry.is_file(follow_symlinks=False)
+            }
+        for file_entry in present.values():
+            file_entry.stat()
+    except FileNotFoundError:
+        return None
+    return entry, present
 
-    table_names = [
-        str(item.get("table_name"))
-        for item in schema_rows
-        if isinstance(item, dict) and item.get("table_name")
-    ]
 
-    if any(
-        token in query
-        for token in ("list tables", "table names", "what tables", "show tables")
-    ):
-        if not table_names:
-            return (
-                "Gemini quota is temporarily exhausted. I cannot call the LLM right now, "
-                "and no schema table list is available in local files."
+def _listing_etag(scans: list[tuple[Path, dict[str, os.DirEntry]]]) -> str:
+    digest = hashlib.blake2b(digest_size=8)
+    for entry, present in sorted(scans, key=lambda scan: scan[0]):
+        for name in sorted(present):
+            stat = present[name].stat()
+            digest.update(
+                f"{entry.name}/{name}:{stat.st_mtime_ns}:{stat.st_size}\n".encode()
             )
-        preview = ", ".join(table_names[:50])
-        more = "" if len(table_names) <= 50 else f" ... (+{len(table_names) - 50} more)"
-        return (
-            "Gemini quota is temporarily exhausted, so this is a file-based answer.\n"
-            f"Database `{database}` has {len(table_names)} table(s): {preview}{more}"
-        )
+    return f'"{digest.hexdigest()}"'
 
-    if "how many tables" in query or "table count" in query:
-        return (
-            "Gemini quota is temporarily exhausted, so this is a file-based answer.\n"
-            f"Database `{database}` has {len(table_names)} table(s)."
-        )
 
-    if "how many columns" in query or "column count" in query:
-        total_columns = sum(
-            len(item.get("columns", []))
-            for item in schema_rows
-            if isinstance(item, dict) and isinstance(item.get("columns"), list)
-        )
-        return (
-            "Gemini quota is temporarily exhausted, so this is a file-based answer.\n"
-            f"Database `{database}` has {total_columns} column(s) across schema tables."
-        )
+def _load_one_db_summary(entry: Path, present: dict[str, os.DirEntry]) -> dict | None:
+    try:
+        return _db_summary(entry, present)
+    except (FileNotFoundError, ValueError):
+        # The folder vanished (or was half-written) while being listed.
+        return None
 
-    if "relation" in query or "foreign key" in query:
-        relation_count = sum(
-            len(item.get("foreign_keys", []))
-            for item in schema_rows
-            if isinstance(item, dict) and isinstance(item.get("foreign_keys"), list)
-        )
-        return (
-            "Gemini quota is temporarily exhausted, so this is a file-based answer.\n"
-            f"Database `{database}` has {relation_count} foreign-key relationship(s)."
-        )
 
-    if "recommendation" in query:
-        recommendations = (
-            doc_payload.get("overview", {}).get("global_recommendations", [])
-            if isinstance(doc_payload, dict)
-            else []
-        )
-        if isinstance(recommendations, list) and recommendations:
-            lines = "\n".join(f"- {item}" for item in recommendations[:8])
-            return (
-                "Gemini quota is temporarily exhausted, so this is a file-based answer.\n"
-                f"Global recommendations for `{database}`:\n{lines}"
-            )
+def _db_summary(entry: Path, present: dict[str, os.DirEntry]) -> dict | None:
+    if CREDENTIALS_FILENAME not in present:
+        return None
 
-    if any(token in query for token in ("summary", "overview", "describe database")):
-        summary = (
-            doc_payload.get("overview", {}).get("summary")
-            if isinstance(doc_payload, dict)
-            else None
-        )
-        if summary:
-            return (
-                "Gemini quota is temporarily exhausted, so this is a file-based answer.\n"
-                f"Overview for `{database}`:\n{summary}"
-            )
+    try:
+        credentials = read_json(entry / CREDENTIALS_FILENAME)
+    except FileNotFoundError:
+        raise
+    except Exception:
+        credentials = {}
 
-    target_table = None
-    for name in table_names:
-        if name.lower() in query:
-            target_table = name
-            break
-
-    if target_table:
-        schema_entry = next(
-            (
-                row
-                for row in schema_rows
-                if isinstance(row, dict) and row.get("table_name") == target_table
-            ),
-            {},
-        )
-        profile_entry = next(
-            (
-                row
-                for row in profile_rows
-                if isinstance(row, dict) and row.get("table_name") == target_table
-            ),
-            {},
-        )
-        doc_entry = next(
-            (
-                row
-                for row in doc_rows
-                if isinstance(row, dict) and row.get("table_name") == target_table
-            ),
-            {},
-        )
+    meta = _safe_read(entry / META_FILENAME) if META_FILENAME in present else None
+    meta = meta or {}
+    has_schema, tables_found = _listed_file(
+        present.get(SCHEMA_FILENAME), meta, "schema"
+    )
+    has_profiling, tables_profiled = _listed_file(
+        present.get(PROFILING_FILENAME), meta, "profile"
+    )
+    has_doc = DOC_FILENAME in present
 
-        column_count = (
-            len(schema_entry.get("columns", []))
-            if isinstance(schema_entry.get("columns"), list)
-            else 0
-        )
-        pk_count = (
-            len(schema_entry.get("primary_keys", []))
-            if isinstance(schema_entry.get("primary_keys"), list)
-            else 0
-        )
-        fk_count = (
-            len(schema_entry.get("foreign_keys", []))
-            if isinstance(schema_entry.get("foreign_keys"), list)
-            else 0
-        )
-        completeness = (
-            profile_entry.get("completeness", {}).get("table_completeness_pct")
-            if isinstance(profile_entry, dict)
-            else None
-        )
-        freshness = (
-            profile_entry.get("freshness", {}).get("latest_timestamp")
-            if isinstance(profile_entry, dict)
-            else None
-        )
-        priority = doc_entry.get("priority") if isinstance(doc_entry, dict) else None
-        business_summary = (
-            doc_entry.get("business_summary") if isinstance(doc_entry, dict) else None
-        )
+    database_name = credentials.get("database") or entry.name
+    folder = f"{DATA_DIR_RELATIVE}/{entry.name}"
 
-        lines = [
-            "Gemini quota is temporarily exhausted, so this is a file-based answer.",
-            f"Table `{target_table}`:",
-            f"- Columns: {column_count}",
-            f"- Primary keys: {pk_count}",
-            f"- Foreign keys: {fk_count}",
-        ]
-        if completeness is not None:
-            lines.append(f"- Completeness: {completeness}%")
-        if freshness:
-            lines.append(f"- Latest timestamp: {freshness}")
-        if priority:
-            lines.append(f"- Priority: {priority}")
-        if business_summary:
-            lines.append(f"- Business summary: {business_summary}")
-        return "\n".join(lines)
-
-    return (
-        "Gemini quota is temporarily exhausted, so I cannot use the AI model right now. "
-        "I can still answer deterministic questions like: list tables, table counts, "
-        "column counts, relations, overview summary, recommendations, or details for a specific table name."
-    )
+    return {
+        "database": database_name,
+        "database_slug": entry.name,
+        "db_type": credentials.get("db_type"),
+        "host": credentials.get("host"),
+        "has_schema": has_schema,
+        "has_profiling": has_profiling,
+        "has_doc": has_doc,
+        "tables_found": tables_found,
+        "tables_profiled": tables_profiled,
+        "credentials_file": f"{folder}/{CREDENTIALS_FILENAME}",
+        "schema_file": f"{folder}/{SCHEMA_FILENAME}"
+        if SCHEMA_FILENAME in present
+        else None,
+        "profiling_file": f"{folder}/{PROFILING_FILENAME}"
+        if PROFILING_FILENAME in present
+        else None,
+        "doc_file": f"{folder}/{DOC_FILENAME}" if has_doc else None,
+    }
 
 
 @app.get("/databases")
-def list_saved_databases():
+async def list_saved_databases(request: Request):
     try:
-        if not DATA_DIR.exists():
-            return {"status": "success", "count": 0, "databases": []}
-
-        databases = []
-        for entry in DATA_DIR.iterdir():
-            if not entry.is_dir():
-                continue
-
-            credentials_file = entry / "credentials.json"
-            if not credentials_file.exists():
-                continue
-
-            credentials = _safe_read(credentials_file) or {}
-            schema_file = entry / "schema.json"
-            profiling_file = entry / "profiling.json"
-            doc_file = entry / "doc.json"
-
-            schema_payload = _safe_read(schema_file)
-            profiling_payload = _safe_read(profiling_file)
-            doc_payload = _safe_read(doc_file)
-
-            database_name = credentials.get("database") or entry.name
-            schema_tables = schema_payload.get("schema", []) if schema_payload else []
-            profiling_tables = (
-                profiling_payload.get("profile", []) if profiling_payload else []
-            )
-
-            databases.append(
-                {
-                    "database": database_name,
-                    "database_slug": entry.name,
-                    "db_type": credentials.get("db_type"),
-                    "host": credentials.get("host"),
-                    "has_schema": schema_payload is not None,
-                    "has_profiling": profiling_payload is not None,
-                    "has_doc": doc_payload is not None,
-                    "tables_found": len(schema_tables)
-                    if isinstance(schema_tables, list)
-                    else 0,
-                    "tables_profiled": len(profiling_tables)
-                    if isinstance(profiling_tables, list)
-                    else 0,
-                    "credentials_file": _relative_path(credentials_file),
-                    "schema_file": _relative_path(schema_file)
-                    if schema_file.exists()
-                    else None,
-                    "profiling_file": _relative_path(profiling_file)
-                    if profiling_file.exists()
-                    else None,
-                    "doc_file": _relative_path(doc_file) if doc_file.exists() else None,
-                }
+        database_dirs = await run_in_threadpool(_list_database_dirs)
+        scanned = await asyncio.gather(
+            *(run_in_threadpool(_scan_database_dir, entry) for entry in database_dirs)
+        )
+        scans = [scan for scan in scanned if scan is not None]
+        # The listing only changes when files under data/ do, so a matching
+        # ETag skips summarizing and encoding it again.
+        etag = _listing_etag(scans)
+        headers = {"ETag": etag, "Cache-Control": "private, must-revalidate"}
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+
+        # Folders are summarized concurrently so the listing is bounded by the
+        # slowest folder rather than the sum of all their file reads.
+        summaries = await asyncio.gather(
+            *(
+                run_in_threadpool(_load_one_db_summary, entry, present)
+                for entry, present in scans
             )
-
-        databases.sort(key=lambda item: item["database"].lower())
-        return {"status": "success", "count": len(databases), "databases": databases}
+        )
+        keyed = [
+            (summary["database"].casefold(), summary)
+            for summary in summaries
+            if summary is not None
+        ]
+        keyed.sort(key=itemgetter(0))
+        databases = [summary for _, summary in keyed]
+        return DataLensJSONResponse(
+            {"status": "success", "count": len(databases), "databases": databases},
+            headers=headers,
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to list databases: {e}")
 
 
 @app.delete("/databases/{database}")
-def delete_saved_database(database: str):
+async def delete_saved_database(database: str, background_tasks: BackgroundTasks):
     try:
         database_slug = slugify_database_name(database)
         database_dir = get_database_dir(database, create=False)
@@ -403,7 +469,13 @@ def delete_saved_database(database: str):
                 detail=f"Database folder not found for '{database}'.",
             )
 
-        shutil.rmtree(database_dir)
+        # The rename is atomic, so the database disappears immediately; the
+        # recursive removal runs after the response has been sent.
+        doomed_dir = DATA_DIR / f".{database_slug}{_DELETING_MARKER}{secrets.token_hex(8)}"
+        database_dir.rename(doomed_dir)
+        _forget_database_state(database_dir, database_slug)
+        _forget_active_chat_database()
+        background_tasks.add_task(_remove_tree, doomed_dir)
         return {
             "status": "success",
             "database": database,
@@ -418,27 +490,101 @@ def delete_saved_database(database: str):
         raise HTTPException(status_code=500, detail=f"Failed to delete database: {e}")
 
 
-@app.post("/databases/overview")
-def get_saved_database_overview(request: DatabaseTriggerRequest):
+@app.delete("/databases/{database}/cache")
+def evict_database_engine(database: str):
+    """Close pooled connections held for a saved database."""
     try:
-        load_credentials(request.database)
-        schema_payload = read_json(get_schema_file(request.database))
-        profiling_payload = read_json(get_profiling_file(request.database))
-        doc_payload = read_json(get_doc_file(request.database))
-        database_slug = slugify_database_name(request.database)
+        database_slug = slugify_database_name(database)
+        _forget_database_state(get_database_dir(database, create=False), database_slug)
         return {
             "status": "success",
-            "database": request.database,
+            "database": database,
             "database_slug": database_slug,
-            "schema": schema_payload.get("schema", []),
-            "profile": profiling_payload.get("profile", []),
-            "doc": doc_payload,
-            "sources": {
-                "schema_file": _relative_path(get_schema_file(request.database)),
-                "profiling_file": _relative_path(get_profiling_file(request.database)),
-                "doc_file": _relative_path(get_doc_file(request.database)),
-            },
+            "engines_disposed": _dispose_database_engine(database),
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to evict engine: {e}")
+
+
+_OVERVIEW_SECTION_FILES = {
+    "schema": get_schema_file,
+    "profiling": get_profiling_file,
+    "doc": get_doc_file,
+}
+
+
+@functools.lru_cache(maxsize=256)
+def _overview_shell(database: str) -> dict:
+    # The per-database fields of the overview; callers copy before adding
+    # the payloads, so the cached dict is never mutated.
+    return {
+        "status": "success",
+        "database": database,
+        "database_slug": slugify_database_name(database),
+        "sources": {
+            "schema_file": _relative_path(get_schema_file(database)),
+            "profiling_file": _relative_path(get_profiling_file(database)),
+            "doc_file": _relative_path(get_doc_file(database)),
+        },
+    }
+
+
+def _overview_etag(files: tuple[Path, ...]) -> str | None:
+    digest = hashlib.blake2b(digest_size=12)
+    for path in files:
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        digest.update(
+            f"{path.parent.name}/{path.name}:{stat.st_mtime_ns}:{stat.st_size}\n".encode()
+        )
+    return f'"{digest.hexdigest()}"'
+
+
+@app.post("/databases/overview")
+async def get_saved_database_overview(request: OverviewRequest, http_request: Request):
+    try:
+        if request.section is not None:
+            # A single stored file is sent as-is (sendfile), with no parse or
+            # re-encode on the way out.
+            section_file = _OVERVIEW_SECTION_FILES[request.section](request.database)
+            await run_in_threadpool(load_credentials, request.database)
+            return _stored_json_response(section_file)
+
+        schema_file = get_schema_file(request.database)
+        profiling_file = get_profiling_file(request.database)
+        doc_file = get_doc_file(request.database)
+        _, etag = await asyncio.gather(
+            run_in_threadpool(load_credentials, request.database),
+            run_in_threadpool(_overview_etag, (schema_file, profiling_file, doc_file)),
+        )
+        headers = {}
+        if etag is not None:
+            # Polling clients get a 304 while none of the three files changed,
+            # skipping the reads and the encode of the merged payload.
+            headers = {"ETag": etag, "Cache-Control": "private, must-revalidate"}
+            if http_request.headers.get("if-none-match") == etag:
+                return Response(status_code=304, headers=headers)
+
+        # The three files are independent; read them side by side in the
+        # threadpool instead of one after another on a single worker.
+        schema_payload, profiling_payload, doc_payload = await asyncio.gather(
+            run_in_threadpool(read_json, schema_file),
+            run_in_threadpool(read_json, profiling_file),
+            run_in_threadpool(read_json, doc_file),
+        )
+        response = dict(_overview_shell(request.database))
+        response["schema"] = schema_payload.get("schema", [])
+        response["profile"] = profiling_payload.get("profile", [])
+        response["doc"] = doc_payload
+        # Returned as a response object so FastAPI does not walk the large
+        # schema/profile/doc payloads with jsonable_encoder first.
+        return DataLensJSONResponse(response, headers=headers)
+    except HTTPException:
+        raise
     except FileNotFoundError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except ValueError as e:
@@ -449,10 +595,31 @@ def get_saved_database_overview(request: DatabaseTriggerRequest):
         )
 
 
+def _dispose_database_engine(database: str) -> int:
+    try:
+        credentials = load_credentials(database)
+    except (FileNotFoundError, ValueError):
+        return 0
+    return dispose_engine(
+        build_connection_url(
+            credentials["db_type"],
+            credentials["host"],
+            credentials["port"],
+            credentials["database"],
+            credentials["username"],
+            credentials["password"],
+        )
+    )
+
+
 @app.post("/databases/credentials")
 def save_database_credentials(request: CredentialsSaveRequest):
     try:
+        # Connections opened with the previous credentials are closed rather
+        # than left idling in the pool of an engine nobody will ask for again.
+        _dispose_database_engine(request.database)
         saved = save_credentials(request.model_dump())
+        _forget_active_chat_database()
         database_slug = slugify_database_name(saved["database"])
         credentials_file = get_credentials_file(saved["database"])
         return {
@@ -467,6 +634,79 @@ def save_database_credentials(request: CredentialsSaveRequest):
         raise HTTPException(status_code=500, detail=f"Failed to save credentials: {e}")
 
 
+async def _activate_chat_database(database: str) -> None:
+    # The agent tools read a process-wide active database; switching it is
+    # only needed when a message targets a different database than the last.
+    global _ACTIVE_CHAT_DATABASE
+    async with _ACTIVE_CHAT_DATABASE_LOCK:
+        if _ACTIVE_CHAT_DATABASE == database:
+            return
+
+        set_db_result = set_active_database(database)
+        if set_db_result.get("status") != "success":
+            raise HTTPException(
+                status_code=400,
+                detail=set_db_result.get("message", "Failed to set active database."),
+            )
+        _ACTIVE_CHAT_DATABASE = database
+
+
+def _forget_database_state(database_dir: Path, database_slug: str) -> None:
+    # Per-database caches would otherwise grow with every slug ever seen.
+    forget_cached_json(database_dir)
+    forget_fallback_indexes(database_slug)
+    lock = _PROFILE_LOCKS.get(database_slug)
+    if lock is not None and not lock.locked():
+        # A running profile keeps its lock so new requests still queue on it.
+        _PROFILE_LOCKS.pop(database_slug, None)
+
+
+def _forget_active_chat_database() -> None:
+    global _ACTIVE_CHAT_DATABASE
+    _ACTIVE_CHAT_DATABASE = None
+
+
+def _sse_event(payload: dict, event: str | None = None) -> bytes:
+    prefix = f"event: {event}\n".encode() if event else b""
+    return prefix + b"data: " + _dump_json(payload) + b"\n\n"
+
+
+async def _stream_chat_reply(
+    request: ChatMessageRequest, message: str, user_id: str, session, new_message
+):
+    # Server-sent events: one `data` event per agent text chunk as it arrives,
+    # then a `done` event carrying the session id for the next turn.
+    sent_chunk = False
+    try:
+        async for event in _get_chat_runner().run_async(
+            user_id=user_id,
+            session_id=session.id,
+            new_message=new_message,
+        ):
+            text_chunk = _extract_event_text(event)
+            if text_chunk:
+                sent_chunk = True
+                yield _sse_event({"chunk": text_chunk})
+    except Exception as e:
+        error_text = str(e)
+        if not sent_chunk and ("RESOURCE_EXHAUSTED" in error_text or "429" in error_text):
+            fallback_reply = fallback_database_reply(request.database, message)
+            yield _sse_event({"chunk": fallback_reply, "fallback_mode": "quota_file_based"})
+        else:
+            yield _sse_event({"detail": f"Agent execution failed: {error_text}"}, "error")
+            return
+
+    yield _sse_event(
+        {
+            "status": "success",
+            "database": request.database,
+            "session_id": session.id,
+            "user_id": user_id,
+        },
+        "done",
+    )
+
+
 @app.post("/chat/message")
 async def chat_with_database_agent(request: ChatMessageRequest):
     message = request.message.strip()
@@ -476,15 +716,10 @@ async def chat_with_database_agent(request: ChatMessageRequest):
     if not request.database or not request.database.strip():
         raise HTTPException(status_code=400, detail="database is required.")
 
-    set_db_result = set_active_database(request.database)
-    if set_db_result.get("status") != "success":
-        raise HTTPException(
-            status_code=400,
-            detail=set_db_result.get("message", "Failed to set active database."),
-        )
+    await _activate_chat_database(request.database)
 
     user_id = request.user_id.strip() or "datalens-ui"
-    session_id = (request.session_id or "").strip() or str(uuid.uuid4())
+    session_id = (request.session_id or "").strip() or secrets.token_hex(16)
 
     session = await CHAT_SESSION_SERVICE.get_session(
         app_name=CHAT_APP_NAME,
@@ -498,27 +733,35 @@ async def chat_with_database_agent(request: ChatMessageRequest):
             session_id=session_id,
         )
 
-    prompt = (
-        f"Active database is '{request.database}'. "
-        "Use this database context unless user explicitly asks to switch.\n\n"
-        f"User query:\n{message}"
+    prompt = "".join(
+        (_CHAT_PROMPT_HEAD, request.database, _CHAT_PROMPT_TAIL, message)
     )
     new_message = genai_types.UserContent(parts=[genai_types.Part(text=prompt)])
 
-    reply_chunks = []
+    if request.stream:
+        return StreamingResponse(
+            _stream_chat_reply(request, message, user_id, session, new_message),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache"},
+        )
+
+    # Event texts are appended to one buffer instead of a list joined later.
+    reply_buffer = io.StringIO()
     try:
-        async for event in CHAT_RUNNER.run_async(
+        async for event in _get_chat_runner().run_async(
             user_id=user_id,
             session_id=session.id,
             new_message=new_message,
         ):
             text_chunk = _extract_event_text(event)
             if text_chunk:
-                reply_chunks.append(text_chunk)
+                if reply_buffer.tell():
+                    reply_buffer.write("\n")
+                reply_buffer.write(text_chunk)
     except Exception as e:
         error_text = str(e)
         if "RESOURCE_EXHAUSTED" in error_text or "429" in error_text:
-            fallback_reply = _fallback_database_reply(request.database, message)
+            fallback_reply = fallback_database_reply(request.database, message)
             return {
                 "status": "success",
                 "database": request.database,
@@ -534,7 +777,7 @@ async def chat_with_database_agent(request: ChatMessageRequest):
             )
         raise HTTPException(status_code=500, detail=f"Agent execution failed: {error_text}")
 
-    reply = "\n".join(chunk for chunk in reply_chunks if chunk).strip()
+    reply = reply_buffer.getvalue().strip()
     if not reply:
         reply = (
             "I could not generate a response from the agent. "
@@ -550,8 +793,77 @@ async def chat_with_database_agent(request: ChatMessageRequest):
     }
 
 
+def _summary_response(response: dict, key: str) -> DataLensJSONResponse:
+    # Everything but the bulky list; clients fetch the stored file on demand.
+    return DataLensJSONResponse(
+        {name: value for name, value in response.items() if name != key}
+    )
+
+
+def _stored_json_response(path: Path) -> FileResponse:
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail=f"File not found: {_relative_path(path)}")
+    return FileResponse(path, media_type="application/json")
+
+
+@app.get("/databases/{database}/schema")
+def get_saved_schema(database: str):
+    """Serve the stored schema.json without parsing it."""
+    try:
+        return _stored_json_response(get_schema_file(database))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/databases/{database}/profiling")
+def get_saved_profiling(database: str):
+    """Serve the stored profiling.json without parsing it."""
+    try:
+        return _stored_json_response(get_profiling_file(database))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/databases/{database}/doc")
+def get_saved_doc(database: str):
+    """Serve the stored doc.json without parsing it."""
+    try:
+        return _stored_json_response(get_doc_file(database))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# The extract helpers return the payload together with its encoded body; the
+# same bytes are written to disk and sent back, so each payload is encoded once.
+def _schema_response(database: str, engine, refresh: bool) -> tuple[dict, bytes]:
+    schema_file = get_schema_file(database, create_dir=True)
+    fingerprint = schema_fingerprint(engine)
+    if not refresh:
+        cached_response = _read_cached_schema(schema_file, database, fingerprint)
+        if cached_response is not None:
+            record_table_count(schema_file, len(cached_response["schema"]))
+            return cached_response, _dump_json(cached_response)
+
+    schema = extract_schema(engine)
+    database_slug = slugify_database_name(database)
+
+    response = {
+        "status": "success",
+        "database": database,
+        "database_slug": database_slug,
+        "tables_found": len(schema),
+        "schema": schema,
+        "schema_file": _relative_path(schema_file),
+        "schema_fingerprint": fingerprint,
+    }
+    body = _dump_json(response)
+    write_json_bytes(schema_file, body)
+    record_table_count(schema_file, len(schema))
+    return response, body
+
+
 @app.post("/databases/schema/extract")
-def extract_db_schema(request: DatabaseTriggerRequest):
+def extract_db_schema(request: SchemaExtractRequest):
     try:
         credentials = load_credentials(request.database)
         connection_url = build_connection_url(
@@ -562,26 +874,80 @@ def extract_db_schema(request: DatabaseTriggerRequest):
             credentials["username"],
             credentials["password"],
         )
-        success, message = test_connection(connection_url)
-        if not success:
-            raise HTTPException(status_code=400, detail=message)
 
-        engine = create_engine_from_url(connection_url)
-        schema = extract_schema(engine)
-        database_slug = slugify_database_name(request.database)
-        schema_file = get_schema_file(request.database, create_dir=True)
+        engine = get_engine(connection_url)
+        response, body = _schema_response(request.database, engine, request.refresh)
+        if request.summary:
+            return _summary_response(response, "schema")
+        return _json_bytes_response(body)
+
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        response = {
-            "status": "success",
-            "database": request.database,
-            "database_slug": database_slug,
-            "tables_found": len(schema),
-            "schema": schema,
-            "schema_file": _relative_path(schema_file),
-        }
-        safe_response = _to_json_safe(response)
-        write_json(schema_file, safe_response)
-        return safe_response
+
+def _profile_engine(database: str):
+    credentials = load_credentials(database)
+    connection_url = build_connection_url(
+        credentials["db_type"],
+        credentials["host"],
+        credentials["port"],
+        credentials["database"],
+        credentials["username"],
+        credentials["password"],
+    )
+    return get_engine(connection_url)
+
+
+def _profile_table_metadata(database: str, engine):
+    # A schema.json that still matches the live catalog already holds the
+    # tables, columns and keys profiling needs; only reflect when it doesn't.
+    cached_schema = _read_cached_schema(
+        get_schema_file(database), database, schema_fingerprint(engine)
+    )
+    if cached_schema is not None:
+        return profile_tables_from_schema(cached_schema["schema"])
+    return reflect_profile_tables(engine)
+
+
+def _profile_response(
+    database: str, engine, approximate: bool, table_metadata
+) -> tuple[dict, bytes]:
+    profile = extract_data_profile(
+        engine, approximate=approximate, table_metadata=table_metadata
+    )
+    database_slug = slugify_database_name(database)
+    profiling_file = get_profiling_file(database, create_dir=True)
+
+    response = {
+        "status": "success",
+        "database": database,
+        "database_slug": database_slug,
+        "tables_profiled": len(profile),
+        "profile": profile,
+        "profiling_file": _relative_path(profiling_file),
+    }
+    body = _dump_json(response)
+    write_json_bytes(profiling_file, body)
+    record_table_count(profiling_file, len(profile))
+    return response, body
+
+
+def _profile_database(request: ProfileRequest):
+    try:
+        engine = _profile_engine(request.database)
+        response, body = _profile_response(
+            request.database,
+            engine,
+            request.approximate,
+            _profile_table_metadata(request.database, engine),
+        )
+        if request.summary:
+            return _summary_response(response, "profile")
+        return _json_bytes_response(body)
 
     except FileNotFoundError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -591,39 +957,94 @@ def extract_db_schema(request: DatabaseTriggerRequest):
         raise HTTPException(status_code=400, detail=str(e))
 
 
+def _profile_stream_chunks(request: ProfileRequest, engine):
+    table_metadata = _profile_table_metadata(request.database, engine)
+    profiling_file = get_profiling_file(request.database, create_dir=True)
+    head = {
+        "status": "success",
+        "database": request.database,
+        "database_slug": slugify_database_name(request.database),
+        "tables_profiled": len(table_metadata),
+        "profiling_file": _relative_path(profiling_file),
+    }
+    yield from stream_json(
+        profiling_file,
+        head,
+        "profile",
+        iter_data_profile(engine, request.approximate, table_metadata),
+        default=_orjson_default,
+    )
+    record_table_count(profiling_file, len(table_metadata))
+
+
+async def _stream_profile(request: ProfileRequest, engine, lock: asyncio.Lock):
+    async with lock:
+        chunks = _profile_stream_chunks(request, engine)
+        try:
+            async for chunk in iterate_in_threadpool(chunks):
+                yield chunk
+        finally:
+            # On client disconnect the generator would otherwise be closed by
+            # GC, possibly on the event loop; close it while the lock is held
+            # so profiling workers release their connections first. The
+            # surrounding task is already cancelled then, hence the shield.
+            with anyio.CancelScope(shield=True):
+                await run_in_threadpool(chunks.close)
+
+
 @app.post("/databases/profiling/extract")
-def profile_db_data(request: DatabaseTriggerRequest):
+async def profile_db_data(request: ProfileRequest):
     try:
-        credentials = load_credentials(request.database)
-        connection_url = build_connection_url(
-            credentials["db_type"],
-            credentials["host"],
-            credentials["port"],
-            credentials["database"],
-            credentials["username"],
-            credentials["password"],
+        database_slug = slugify_database_name(request.database)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # A full profile scans every table; concurrent requests for the same
+    # database wait for the running one instead of doubling the load.
+    lock = _PROFILE_LOCKS.setdefault(database_slug, asyncio.Lock())
+
+    if request.stream:
+        try:
+            engine = await run_in_threadpool(_profile_engine, request.database)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return StreamingResponse(
+            _stream_profile(request, engine, lock), media_type="application/json"
         )
 
-        success, message = test_connection(connection_url)
-        if not success:
-            raise HTTPException(status_code=400, detail=message)
+    async with lock:
+        return await run_in_threadpool(_profile_database, request)
 
-        engine = create_engine_from_url(connection_url)
-        profile = extract_data_profile(engine)
-        database_slug = slugify_database_name(request.database)
-        profiling_file = get_profiling_file(request.database, create_dir=True)
 
-        response = {
-            "status": "success",
-            "database": request.database,
-            "database_slug": database_slug,
-            "tables_profiled": len(profile),
-            "profile": profile,
-            "profiling_file": _relative_path(profiling_file),
-        }
-        safe_response = _to_json_safe(response)
-        write_json(profiling_file, safe_response)
-        return safe_response
+def _extract_all(request: ExtractAllRequest):
+    try:
+        engine = _profile_engine(request.database)
+        schema_response, schema_body = _schema_response(
+            request.database, engine, request.refresh
+        )
+        # The profile reuses the tables just reflected for the schema, so the
+        # catalog is only walked once per combined extraction.
+        _, profile_body = _profile_response(
+            request.database,
+            engine,
+            request.approximate,
+            profile_tables_from_schema(schema_response["schema"]),
+        )
+        head = _dump_json(
+            {
+                "status": "success",
+                "database": request.database,
+                "database_slug": slugify_database_name(request.database),
+            }
+        )
+        return _json_bytes_response(
+            head[:-1]
+            + b',"schema":'
+            + schema_body
+            + b',"profile":'
+            + profile_body
+            + b"}"
+        )
 
     except FileNotFoundError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -633,6 +1054,19 @@ def profile_db_data(request: DatabaseTriggerRequest):
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@app.post("/databases/extract-all")
+async def extract_all(request: ExtractAllRequest):
+    """Extract schema and data profile in one call over a shared engine."""
+    try:
+        database_slug = slugify_database_name(request.database)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    lock = _PROFILE_LOCKS.setdefault(database_slug, asyncio.Lock())
+    async with lock:
+        return await run_in_threadpool(_extract_all, request)
+
+
 @app.post("/databases/doc/generate")
 def generate_db_business_doc(request: DatabaseTriggerRequest):
     try:
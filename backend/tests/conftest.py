@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# The backend modules import each other as top-level modules (`from db import
+# ...`), the same way uvicorn runs them from this directory.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,18 @@
+import asyncio
+
+import ai
+
+
+def test_generate_business_documents_works_inside_a_running_loop(monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(
+        ai, "generate_business_document", lambda database: {"database": database}
+    )
+
+    async def call_from_handler():
+        return ai.generate_business_documents(["sales", "crm"], max_concurrency=2)
+
+    assert asyncio.run(call_from_handler()) == [
+        {"database": "sales"},
+        {"database": "crm"},
+    ]
@@ -0,0 +1,55 @@
+import os
+
+import data_store
+from data_store import forget_cached_json, read_json, write_json, write_json_bytes
+
+
+def test_read_json_reuses_the_cached_payload(tmp_path):
+    path = tmp_path / "schema.json"
+    write_json(path, {"schema": [1]})
+
+    assert read_json(path) is read_json(path)
+
+
+def test_rewrite_invalidates_the_cached_payload(tmp_path):
+    path = tmp_path / "schema.json"
+    write_json(path, {"schema": [1]})
+    first = read_json(path)
+
+    # Same size and, on coarse filesystems, possibly the same mtime.
+    write_json(path, {"schema": [2]})
+
+    assert read_json(path) == {"schema": [2]}
+    assert read_json(path) is not first
+
+
+def test_byte_identical_write_is_skipped(tmp_path):
+    path = tmp_path / "schema.json"
+    write_json_bytes(path, b'{"schema": []}')
+    os.utime(path, ns=(1, 1))
+
+    write_json_bytes(path, b'{"schema": []}')
+
+    assert path.stat().st_mtime_ns == 1
+
+
+def test_write_leaves_no_temporary_files(tmp_path):
+    path = tmp_path / "schema.json"
+    write_json_bytes(path, b'{"schema": []}')
+    write_json_bytes(path, b'{"schema": [1]}')
+
+    assert [entry.name for entry in tmp_path.iterdir()] == ["schema.json"]
+
+
+def test_forget_cached_json_drops_only_that_directory(tmp_path):
+    kept_dir = tmp_path / "kept"
+    dropped_dir = tmp_path / "dropped"
+    write_json(kept_dir / "schema.json", {"schema": []})
+    write_json(dropped_dir / "schema.json", {"schema": []})
+    read_json(kept_dir / "schema.json")
+    read_json(dropped_dir / "schema.json")
+
+    forget_cached_json(dropped_dir)
+
+    assert kept_dir / "schema.json" in data_store._JSON_CACHE
+    assert dropped_dir / "schema.json" not in data_store._JSON_CACHE
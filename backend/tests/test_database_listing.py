@@ -0,0 +1,33 @@
+from fastapi.testclient import TestClient
+
+import main
+from data_store import write_json
+
+
+def _saved_database(data_dir, slug, database):
+    folder = data_dir / slug
+    write_json(folder / "credentials.json", {"database": database, "db_type": "mysql"})
+    return folder
+
+
+def test_listing_skips_folders_that_vanish_mid_scan(tmp_path, monkeypatch):
+    kept = _saved_database(tmp_path, "sales", "Sales")
+    vanished = tmp_path / "crm"  # deleted between the directory walk and its scan
+    monkeypatch.setattr(main, "_list_database_dirs", lambda: [kept, vanished])
+
+    response = TestClient(main.app).get("/databases")
+
+    assert response.status_code == 200
+    assert [entry["database_slug"] for entry in response.json()["databases"]] == ["sales"]
+
+
+def test_summary_skips_files_that_vanish_after_the_scan(tmp_path):
+    folder = _saved_database(tmp_path, "sales", "Sales")
+    write_json(folder / "schema.json", {"schema": []})
+    scan = main._scan_database_dir(folder)
+    (folder / "schema.json").unlink()
+    (folder / "credentials.json").unlink()
+    folder.rmdir()
+
+    assert main._scan_database_dir(folder) is None
+    assert main._load_one_db_summary(*scan) is None
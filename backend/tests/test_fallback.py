@@ -0,0 +1,41 @@
+import fallback
+
+
+def test_forget_fallback_indexes_drops_only_that_database():
+    rows = [{"table_name": "order"}]
+    fallback._table_name_index("Sales DB", rows)
+    fallback._rows_by_table_name("Sales DB", "schema", rows)
+    fallback._rows_by_table_name("Other", "schema", rows)
+
+    fallback.forget_fallback_indexes("sales-db")
+
+    assert "Sales DB" not in fallback._TABLE_NAME_INDEX
+    assert ("Sales DB", "schema") not in fallback._ROW_INDEXES
+    assert ("Other", "schema") in fallback._ROW_INDEXES
+
+
+def _match(query, table_names):
+    _, word_names, other_names = fallback._table_name_index(
+        "matcher-test", [{"table_name": name} for name in table_names]
+    )
+    return fallback._match_table_name(query, word_names, other_names)
+
+
+def test_plural_and_singular_query_words_find_the_table():
+    tables = ["order", "customers", "category"]
+
+    assert _match("show orders", tables) == "order"
+    assert _match("list every customer", tables) == "customers"
+    assert _match("categories by revenue", tables) == "category"
+
+
+def test_first_table_in_schema_order_wins():
+    tables = ["customer", "order", "user-log"]
+
+    assert _match("orders per customer", tables) == "customer"
+    assert _match("user-log rows per order", tables) == "order"
+
+
+def test_names_with_non_word_characters_use_substring_matching():
+    assert _match("describe the user-log table", ["order", "user-log"]) == "user-log"
+    assert _match("nothing relevant", ["order", "user-log"]) is None
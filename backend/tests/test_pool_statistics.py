@@ -0,0 +1,15 @@
+import db
+
+
+def test_pool_statistics_report_counts_only(tmp_path):
+    database_file = tmp_path / "internal-sales.db"
+    engine = db.create_engine_from_url(f"sqlite:///{database_file}")
+    db.warm_engine(engine)
+
+    engine_id = db._engine_id(engine)
+    (stats,) = [entry for entry in db.pool_statistics() if entry["id"] == engine_id]
+
+    assert set(stats) == {"id", "size", "checked_in", "checked_out", "overflow"}
+    assert stats["checked_in"] == 1 and stats["checked_out"] == 0
+    assert "internal-sales" not in repr(db.pool_statistics())
+    engine.dispose()
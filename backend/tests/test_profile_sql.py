@@ -0,0 +1,58 @@
+import sqlite3
+
+import pytest
+
+from db import _DIALECT_SQL, _GENERIC_SQL, _orphan_count_sql
+
+CONDITIONS = [
+    '(l."customer_id" IS NOT NULL) AND NOT EXISTS ('
+    'SELECT 1 FROM "customer" AS p WHERE p."id" = l."customer_id")',
+    '(l."product_id" IS NOT NULL) AND NOT EXISTS ('
+    'SELECT 1 FROM "product" AS p WHERE p."id" = l."product_id")',
+]
+
+
+@pytest.fixture
+def orders_db():
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(
+        """
+        CREATE TABLE customer (id INTEGER PRIMARY KEY);
+        CREATE TABLE product (id INTEGER PRIMARY KEY);
+        CREATE TABLE "order" (customer_id INTEGER, product_id INTEGER);
+        INSERT INTO customer VALUES (1);
+        INSERT INTO product VALUES (1), (2);
+        INSERT INTO "order" VALUES (1, 1), (2, 1), (3, 9), (NULL, 2);
+        """
+    )
+    yield conn
+    conn.close()
+
+
+def test_mssql_counts_orphans_outside_aggregates():
+    sql = _orphan_count_sql(_DIALECT_SQL["mssql"], '"order"', CONDITIONS)
+
+    assert "SUM(" not in sql and "CASE" not in sql
+    assert sql == (
+        f'SELECT (SELECT COUNT_BIG(*) FROM "order" AS l WHERE {CONDITIONS[0]}), '
+        f'(SELECT COUNT_BIG(*) FROM "order" AS l WHERE {CONDITIONS[1]})'
+    )
+
+
+@pytest.mark.parametrize(
+    "dialect_sql",
+    [_DIALECT_SQL["postgresql"], _DIALECT_SQL["mysql"], _GENERIC_SQL],
+    ids=["postgresql", "mysql", "generic"],
+)
+def test_single_pass_orphan_counts(dialect_sql, orders_db):
+    sql = _orphan_count_sql(dialect_sql, '"order"', CONDITIONS)
+
+    assert sql.startswith("SELECT ") and sql.endswith(' FROM "order" AS l')
+    assert orders_db.execute(sql).fetchone() == (2, 1)
+
+
+def test_scalar_orphan_counts_match(orders_db):
+    dialect_sql = _DIALECT_SQL["mssql"]._replace(count="COUNT")
+    sql = _orphan_count_sql(dialect_sql, '"order"', CONDITIONS)
+
+    assert orders_db.execute(sql).fetchone() == (2, 1)
@@ -0,0 +1,60 @@
+import pytest
+
+from chat_agent.agent import _is_plainly_read_only, _validate_read_only_sql
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "SELECT 1 AS [x-- ]; DROP TABLE t; COMMIT",
+        "SELECT 1 AS [']; DELETE FROM t; COMMIT; SELECT 1 AS [']",
+        "SELECT 1 AS [/*]; DROP TABLE t; SELECT 1 AS [*/]",
+        "SELECT 1 AS `x-- `; DROP TABLE t",
+        "SELECT `'` FROM t; DROP TABLE t; SELECT `'` ",
+        # PostgreSQL nests block comments; sqlparse does not.
+        "SELECT 1 /* /* */ ' */ ; COMMIT; "
+        "SET default_transaction_read_only = off; DROP TABLE t; -- '",
+        # MySQL treats `#` as a line comment.
+        "SELECT * FROM users #'\nINTO OUTFILE '/tmp/pwn' -- '",
+        "SELECT 1 # '\n' ; DROP TABLE t; --'",
+    ],
+)
+def test_hidden_statements_are_rejected(query):
+    assert not _is_plainly_read_only(query.strip())
+    error = _validate_read_only_sql(query)
+    assert error is not None
+    assert error["error_type"] == "unsafe_sql"
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "SELECT a, b FROM t WHERE x > 1;",
+        "WITH c AS (SELECT 1) SELECT * FROM c",
+    ],
+)
+def test_plain_queries_take_the_fast_path(query):
+    assert _is_plainly_read_only(query)
+    assert _validate_read_only_sql(query) is None
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "SELECT * FROM t WHERE code = '#A1'",
+        "SELECT [order id] FROM t",
+        "SELECT a /* note */ FROM t",
+        "SELECT a FROM t -- note\n",
+    ],
+)
+def test_quoted_and_commented_queries_use_the_parser(query):
+    assert not _is_plainly_read_only(query.strip())
+    assert _validate_read_only_sql(query) is None
+
+
+@pytest.mark.parametrize(
+    "query",
+    ["UPDATE t SET a = 1", "SELECT 1; SELECT 2", "SELECT a INTO b FROM t"],
+)
+def test_writes_are_rejected(query):
+    assert _validate_read_only_sql(query)["error_type"] == "unsafe_sql"